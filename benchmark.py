@@ -0,0 +1,313 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import threading
+import tracemalloc
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtCore import QEventLoop, PYQT_VERSION_STR, QT_VERSION_STR
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtWebEngineWidgets import QWebEnginePage
+
+from main import (SessionRecorder, ReplayScheduler, SessionReplayer, BrowserDriver, BinarySession, COMPRESSION_SUFFIXES, JOURNAL_EXTENSION, BINARY_EXTENSION, event_offsets, install_replay_agent, summarize_values, zstandard)
+
+BENCHMARK_FORMAT = "toolskitch-benchmark"
+BENCHMARK_VERSION = 1
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+QUICK_SIZES = [1000, 10000]
+SESSION_FORMATS = {'json': '.json', 'tsj': JOURNAL_EXTENSION, 'tsb': BINARY_EXTENSION}
+FIXTURE_PAGES = 20
+FIXTURE_HTML = """<!DOCTYPE html>
+<html>
+<head><title>Toolskitch fixture %(page)d</title></head>
+<body>
+<h1>Fixture page %(page)d</h1>
+<form id="search" onsubmit="return false;">
+<input id="q" name="q" type="text">
+</form>
+%(buttons)s
+<div style="height: 4000px;">%(filler)s</div>
+</body>
+</html>
+"""
+LOWER_IS_BETTER = ('_seconds', '_ms', '_mb', '_bytes')
+HIGHER_IS_BETTER = ('_per_second',)
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        page = self.path.strip('/').rpartition('/')[2]
+        page = int(page) if page.isdigit() else 0
+        body = (FIXTURE_HTML % {'page': page, 'buttons': ''.join(f'<button id="b{index}" type="button">Button {index}</button>' for index in range(7)), 'filler': '<p>Lorem ipsum dolor sit amet.</p>' * 50}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    def log_message(self, format, *args):
+        pass
+
+def start_fixture_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, name="BenchmarkFixtureServer", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def synthetic_events(count, base_url="http://127.0.0.1", interval=0.05, seed=1234, navigation_every=50):
+    rng = random.Random(seed)
+    events = []
+    timestamp = 0.0
+    page = 0
+    for index in range(count):
+        if index % navigation_every == 0:
+            url = f"{base_url}/page/{page % FIXTURE_PAGES}"
+            page += 1
+            events.append({'timestamp': timestamp, 'type': 'navigation', 'data': {'url': url}})
+        elif index % navigation_every == 1:
+            events.append({'timestamp': timestamp, 'type': 'page_loaded', 'data': {'url': url}})
+        else:
+            roll = rng.random()
+            if roll < 0.4:
+                events.append({'timestamp': timestamp, 'type': 'click', 'data': {'selector': f"#b{rng.randrange(7)}", 'x': rng.randrange(800), 'y': rng.randrange(600)}})
+            elif roll < 0.7:
+                events.append({'timestamp': timestamp, 'type': 'input', 'data': {'selector': '#q', 'value': f"query {index}"}})
+            elif roll < 0.9:
+                events.append({'timestamp': timestamp, 'type': 'scroll', 'data': {'selector': None, 'x': 0, 'y': rng.randrange(3000)}})
+            else:
+                events.append({'timestamp': timestamp, 'type': 'console_message', 'data': {'level': 0, 'message': f"log line {index}", 'line': 1, 'source': url}})
+        timestamp += interval
+    return events
+
+def recorder_config(directory, streaming=False, compression=None):
+    return {
+        'recording': {'streaming': streaming, 'max_events': 0, 'rate_limits': {}, 'dedupe_window': 0, 'auto_save_interval': 30},
+        'sessions': {'default_directory': directory, 'auto_backup': False, 'compression': compression, 'compression_level': None},
+    }
+
+def best_of(repeat, function):
+    results = [function() for _ in range(repeat)]
+    return min(results, key=lambda result: result[0])
+
+def peak_memory_mb(function):
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    finally:
+        tracemalloc.stop()
+
+def bench_append(events, directory, streaming, repeat):
+    def run():
+        recorder = SessionRecorder(recorder_config(directory, streaming))
+        recorder.start_recording()
+        start_time = recorder.start_time
+        started = time.perf_counter()
+        for event in events:
+            recorder.add_event(event['type'], event['data'], start_time + event['timestamp'])
+        appended = time.perf_counter() - started
+        recorder.stop_recording()
+        stopped = time.perf_counter() - started - appended
+        if recorder.journal:
+            os.remove(recorder.journal.filename)
+        return appended, stopped
+    append_seconds, stop_seconds = best_of(repeat, run)
+    return {'name': 'recorder.append', 'size': len(events), 'variant': 'streaming' if streaming else 'memory', 'append_seconds': append_seconds, 'stop_seconds': stop_seconds, 'events_per_second': len(events) / append_seconds if append_seconds else None}
+
+def bench_save_load(events, directory, session_format, compression, repeat):
+    filename = os.path.join(directory, f"bench_{len(events)}{SESSION_FORMATS[session_format]}{COMPRESSION_SUFFIXES.get(compression, '')}")
+    recorder = SessionRecorder(recorder_config(directory))
+    recorder.start_time = time.time()
+    def save():
+        recorder.events = events
+        started = time.perf_counter()
+        recorder.save_session(filename)
+        return (time.perf_counter() - started,)
+    def load():
+        started = time.perf_counter()
+        loaded = recorder.load_session(filename)['events']
+        opened = time.perf_counter() - started
+        for _ in loaded:
+            pass
+        iterated = time.perf_counter() - started - opened
+        if isinstance(loaded, BinarySession):
+            loaded.close()
+        recorder.events = []
+        return opened, iterated
+    save_seconds = best_of(repeat, save)[0]
+    load_seconds, iterate_seconds = best_of(repeat, load)
+    result = {
+        'name': 'session.save_load', 'size': len(events), 'variant': f"{session_format}+{compression or 'none'}",
+        'save_seconds': save_seconds, 'load_seconds': load_seconds, 'iterate_seconds': iterate_seconds,
+        'file_bytes': os.path.getsize(filename),
+        'save_peak_mb': peak_memory_mb(save),
+        'load_peak_mb': peak_memory_mb(load),
+    }
+    os.remove(filename)
+    return result
+
+def bench_offsets(events, repeat):
+    def run():
+        started = time.perf_counter()
+        for _ in event_offsets(events):
+            pass
+        return (time.perf_counter() - started,)
+    seconds = best_of(repeat, run)[0]
+    return {'name': 'scheduler.offsets', 'size': len(events), 'variant': 'iterate', 'iterate_seconds': seconds, 'events_per_second': len(events) / seconds if seconds else None}
+
+def bench_scheduler(count, interval):
+    scheduler = ReplayScheduler(1.0)
+    lateness = []
+    scheduler.start(0.0)
+    for index in range(count):
+        lateness.append(scheduler.wait_until(index * interval) * 1000)
+    return {'name': 'scheduler.jitter', 'size': count, 'variant': f"{interval * 1000:g}ms", 'jitter_ms': summarize_values(lateness)}
+
+def bench_replay(events, speed, replay_config):
+    app = QApplication.instance() or QApplication([sys.argv[0]])
+    page = QWebEnginePage()
+    install_replay_agent(page)
+    driver = BrowserDriver(page, replay_config)
+    replayer = SessionReplayer(events, driver, speed, replay_config.get('default_delay', 0.5), True, False, 'benchmark')
+    lateness = []
+    errors = []
+    wait_until = replayer.scheduler.wait_until
+    def timed_wait_until(offset):
+        late = wait_until(offset)
+        if late is not None:
+            lateness.append(late * 1000)
+        return late
+    replayer.scheduler.wait_until = timed_wait_until
+    driver.error_signal.connect(errors.append)
+    replayer.error_signal.connect(errors.append)
+    loop = QEventLoop()
+    replayer.finished_signal.connect(loop.quit)
+    started = time.perf_counter()
+    replayer.start()
+    loop.exec_()
+    replayer.wait()
+    seconds = time.perf_counter() - started
+    report = replayer.metrics.report()
+    page.deleteLater()
+    app.processEvents()
+    return {
+        'name': 'replay.run', 'size': len(events), 'variant': 'max' if speed <= 0 else f"{speed:g}x",
+        'run_seconds': seconds, 'events_per_second': len(events) / seconds if seconds else None,
+        'jitter_ms': summarize_values(lateness) if speed > 0 else None,
+        'event_latency_ms': {event_type: series['latency_ms'] for event_type, series in report['event_types'].items() if 'latency_ms' in series},
+        'errors': len(errors),
+    }
+
+def result_key(result):
+    return (result['name'], result['size'], result['variant'])
+
+def flatten_metrics(result, prefix=''):
+    metrics = {}
+    for name, value in result.items():
+        if isinstance(value, dict):
+            metrics.update(flatten_metrics(value, f"{prefix}{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool) and name not in ('size', 'count'):
+            metrics[prefix + name] = value
+    return metrics
+
+def compare_results(baseline, current, tolerance=0.1):
+    previous = {result_key(result): flatten_metrics(result) for result in baseline['results']}
+    lines = []
+    for result in current['results']:
+        old_metrics = previous.get(result_key(result))
+        if not old_metrics:
+            continue
+        for metric, value in flatten_metrics(result).items():
+            old = old_metrics.get(metric)
+            if not old or value is None:
+                continue
+            change = (value - old) / old
+            lower_better = metric.endswith(LOWER_IS_BETTER) or '_ms.' in metric
+            higher_better = metric.endswith(HIGHER_IS_BETTER)
+            if abs(change) < tolerance or not (lower_better or higher_better):
+                continue
+            worse = change > 0 if lower_better else change < 0
+            lines.append(f"{'WORSE ' if worse else 'better'} {result['name']} size={result['size']} {result['variant']} {metric}: {old:.4g} -> {value:.4g} ({change:+.0%})")
+    return lines
+
+def log(message):
+    print(message, file=sys.stderr, flush=True)
+
+def run_benchmarks(args):
+    directory = tempfile.mkdtemp(prefix="toolskitch-bench-")
+    server, base_url = start_fixture_server()
+    compressions = [None if compression == 'none' else compression for compression in args.compression]
+    if 'zstd' in compressions and zstandard is None:
+        compressions.remove('zstd')
+        log("zstandard is not installed, skipping zstd")
+    results = []
+    try:
+        for size in args.sizes:
+            events = synthetic_events(size, base_url)
+            log(f"[{size} events] recorder append")
+            results.append(bench_append(events, directory, False, args.repeat))
+            results.append(bench_append(events, directory, True, args.repeat))
+            for session_format in args.formats:
+                for compression in compressions:
+                    log(f"[{size} events] save/load {session_format}+{compression or 'none'}")
+                    results.append(bench_save_load(events, directory, session_format, compression, args.repeat))
+            results.append(bench_offsets(events, args.repeat))
+            del events
+        log(f"scheduler jitter ({args.jitter_events} events)")
+        results.append(bench_scheduler(args.jitter_events, args.jitter_interval / 1000))
+        if not args.skip_replay:
+            replay_events = synthetic_events(args.replay_events, base_url, args.jitter_interval / 1000)
+            replay_config = {'default_delay': 0.5, 'wait_for_load': True, 'load_timeout': 30}
+            for speed in (1.0, 0.0):
+                log(f"replay {args.replay_events} events at {'max' if speed <= 0 else f'{speed:g}x'} speed")
+                results.append(bench_replay(replay_events, speed, replay_config))
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(directory, ignore_errors=True)
+    return {
+        'format': BENCHMARK_FORMAT,
+        'version': BENCHMARK_VERSION,
+        'started': datetime.now().isoformat(),
+        'environment': {'python': platform.python_version(), 'platform': platform.platform(), 'machine': platform.machine(), 'cpu_count': os.cpu_count(), 'qt': QT_VERSION_STR, 'pyqt': PYQT_VERSION_STR, 'zstandard': zstandard is not None},
+        'parameters': {'sizes': args.sizes, 'formats': args.formats, 'compression': args.compression, 'repeat': args.repeat, 'jitter_events': args.jitter_events, 'jitter_interval_ms': args.jitter_interval, 'replay_events': 0 if args.skip_replay else args.replay_events},
+        'results': results,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Toolskitch benchmarks for the recorder, session serializers and replay scheduler")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="synthetic session sizes in events")
+    parser.add_argument('--quick', action='store_true', help=f"only run sizes {QUICK_SIZES}")
+    parser.add_argument('--formats', nargs='+', choices=sorted(SESSION_FORMATS), default=sorted(SESSION_FORMATS))
+    parser.add_argument('--compression', nargs='+', choices=['none', 'gzip', 'zstd'], default=['none', 'gzip'])
+    parser.add_argument('--repeat', type=int, default=3, help="repeat timed runs and keep the best")
+    parser.add_argument('--jitter-events', type=int, default=200)
+    parser.add_argument('--jitter-interval', type=float, default=10.0, help="spacing between scheduled events in ms")
+    parser.add_argument('--replay-events', type=int, default=300)
+    parser.add_argument('--skip-replay', action='store_true', help="skip the offscreen QtWebEngine replay")
+    parser.add_argument('--output', default=None, help="write the JSON results to this file instead of stdout")
+    parser.add_argument('--baseline', default=None, help="previous results file to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.1, help="relative change reported by --baseline")
+    args = parser.parse_args()
+    if args.quick:
+        args.sizes = QUICK_SIZES
+    results = run_benchmarks(args)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        log(f"Results written to {args.output}")
+    else:
+        print(json.dumps(results, indent=2))
+    if args.baseline:
+        with open(args.baseline) as f:
+            for line in compare_results(json.load(f), results, args.tolerance):
+                log(line)
+
+if __name__ == "__main__":
+    main()
@@ -1,75 +1,2018 @@
 import sys
+import io
 import json
+import gzip
+import zlib
+import math
 import time
+import re
 import os
+import mmap
+import queue
+import shutil
+import struct
+import socket
+import hashlib
+import selectors
+import sqlite3
+import tempfile
+import glob
+import argparse
+import threading
+import bisect
+import difflib
+import functools
+import multiprocessing
+from array import array
+from collections import Counter, defaultdict, deque
+from collections.abc import Sequence
 from datetime import datetime
-from PyQt5.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QLineEdit, QPushButton, QLabel, QTextEdit, QFileDialog, QMessageBox, QSplitter, QProgressBar)
-from PyQt5.QtCore import QTimer, QThread, pyqtSignal, QUrl, Qt
+from urllib.parse import urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QDialog, QVBoxLayout, QHBoxLayout, QWidget, QLineEdit, QPushButton, QLabel, QTextEdit, QFileDialog, QMessageBox, QSplitter, QProgressBar, QComboBox, QListView, QListWidget, QListWidgetItem, QTabWidget, QSlider)
+from PyQt5.QtCore import QTimer, QThread, QObject, QFileSystemWatcher, QEventLoop, QFile, QIODevice, pyqtSlot, pyqtProperty, QAbstractListModel, QModelIndex, QStringListModel, QSortFilterProxyModel, pyqtSignal, QUrl, Qt
 from PyQt5.QtGui import QIcon, QFont, QPalette, QColor, QPixmap
-from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage
+from PyQt5.QtNetwork import QNetworkProxy
+from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage, QWebEngineProfile, QWebEngineScript
+from PyQt5.QtWebEngineCore import QWebEngineUrlRequestInterceptor
+from PyQt5.QtWebChannel import QWebChannel
+
+PROCESS_STARTED = time.perf_counter()
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = os.path.join(APP_DIR, "config.json")
+JOURNAL_FORMAT = "toolskitch-journal"
+JOURNAL_EXTENSION = ".tsj"
+BINARY_EXTENSION = ".tsb"
+BINARY_MAGIC = b"TSKB"
+BINARY_END_MAGIC = b"TSKE"
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct('<4sHH')
+BINARY_EVENT = struct.Struct('<dHII')
+BINARY_FOOTER = struct.Struct('<QQQ4s')
+NO_STRING = 0xFFFFFFFF
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+COMPRESSION_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst'}
+TRUNCATION_ERRORS = (EOFError, OSError, zlib.error) + ((zstandard.ZstdError,) if zstandard else ())
+REPLAY_SPEEDS = [("0.5x", 0.5), ("1x", 1.0), ("2x", 2.0), ("10x", 10.0), ("Max", 0.0)]
+DOM_EVENT_TYPES = ('click', 'input', 'change', 'submit', 'scroll')
+REPLAY_AGENT_JS = """
+(function () {
+    if (window.__toolskitchReplay) {
+        return;
+    }
+    function resolve(data) {
+        if (data.selector) {
+            try {
+                var element = document.querySelector(data.selector);
+                if (element) {
+                    return element;
+                }
+            } catch (error) {
+            }
+        }
+        if (typeof data.x === 'number' && typeof data.y === 'number') {
+            return document.elementFromPoint(data.x, data.y);
+        }
+        return null;
+    }
+    function setValue(element, data) {
+        if (!('value' in element)) {
+            throw new Error('element ' + element.tagName + ' has no value');
+        }
+        if (typeof data.checked === 'boolean' && 'checked' in element) {
+            element.checked = data.checked;
+        } else if (data.value !== undefined && data.value !== null) {
+            element.value = data.value;
+        }
+    }
+    var handlers = {
+        click: function (element) {
+            element.click();
+        },
+        input: function (element, data) {
+            setValue(element, data);
+            element.dispatchEvent(new Event('input', { bubbles: true }));
+        },
+        change: function (element, data) {
+            setValue(element, data);
+            element.dispatchEvent(new Event('change', { bubbles: true }));
+        },
+        submit: function (element) {
+            var form = element.tagName === 'FORM' ? element : element.form;
+            if (!form) {
+                throw new Error('element is not a form');
+            }
+            if (form.requestSubmit) {
+                form.requestSubmit();
+            } else {
+                form.submit();
+            }
+        },
+        scroll: function (element, data) {
+            element.scrollLeft = data.x;
+            element.scrollTop = data.y;
+        }
+    };
+    window.__toolskitchReplay = {
+        run: function (batch) {
+            return batch.map(function (event) {
+                try {
+                    var data = event.data || {};
+                    var handler = handlers[event.type];
+                    if (!handler) {
+                        return { ok: false, error: 'unsupported event type ' + event.type };
+                    }
+                    var started = performance.now();
+                    if (event.type === 'scroll' && !data.selector) {
+                        window.scrollTo(data.x, data.y);
+                        return { ok: true, duration: performance.now() - started };
+                    }
+                    var element = resolve(data);
+                    if (!element) {
+                        return { ok: false, error: 'element not found' };
+                    }
+                    handler(element, data);
+                    return { ok: true, duration: performance.now() - started };
+                } catch (error) {
+                    return { ok: false, error: String(error) };
+                }
+            });
+        }
+    };
+})();
+"""
+CAPTURE_AGENT_JS = """
+(function () {
+    if (window.__toolskitchCapture || typeof QWebChannel === 'undefined' || !window.qt) {
+        return;
+    }
+    var bridge = null;
+    var queue = [];
+    var options = %s;
+    function unique(selector) {
+        try {
+            return document.querySelectorAll(selector).length === 1;
+        } catch (error) {
+            return false;
+        }
+    }
+    function selectorFor(element) {
+        if (!element || element.nodeType !== 1) {
+            return null;
+        }
+        if (element.id && unique('#' + CSS.escape(element.id))) {
+            return '#' + CSS.escape(element.id);
+        }
+        var tag = element.tagName.toLowerCase();
+        var testId = element.getAttribute('data-testid');
+        if (testId && unique('[data-testid="' + CSS.escape(testId) + '"]')) {
+            return '[data-testid="' + CSS.escape(testId) + '"]';
+        }
+        var name = element.getAttribute('name');
+        if (name && unique(tag + '[name="' + CSS.escape(name) + '"]')) {
+            return tag + '[name="' + CSS.escape(name) + '"]';
+        }
+        var parts = [];
+        while (element && element.nodeType === 1 && element !== document.documentElement) {
+            if (element.id && unique('#' + CSS.escape(element.id))) {
+                parts.unshift('#' + CSS.escape(element.id));
+                break;
+            }
+            var part = element.tagName.toLowerCase();
+            var index = 1;
+            var count = 0;
+            var siblings = element.parentElement ? element.parentElement.children : [];
+            for (var i = 0; i < siblings.length; i++) {
+                if (siblings[i].tagName === element.tagName) {
+                    count++;
+                    if (siblings[i] === element) {
+                        index = count;
+                    }
+                }
+            }
+            if (count > 1) {
+                part += ':nth-of-type(' + index + ')';
+            }
+            parts.unshift(part);
+            element = element.parentElement;
+        }
+        return parts.join(' > ');
+    }
+    function valueOf(element) {
+        if (options.mask_passwords && element.type === 'password') {
+            return { value: '', masked: true };
+        }
+        if (element.type === 'checkbox' || element.type === 'radio') {
+            return { checked: element.checked };
+        }
+        return { value: element.value };
+    }
+    function drain() {
+        var payload = queue.length ? JSON.stringify({ now: Date.now(), events: queue }) : null;
+        queue = [];
+        return payload;
+    }
+    function flush() {
+        var payload = drain();
+        if (bridge && payload && bridge.recording) {
+            bridge.capture(payload);
+        }
+    }
+    function enqueue(type, data, immediate) {
+        if (!bridge || !bridge.recording) {
+            return;
+        }
+        var last = queue[queue.length - 1];
+        if (last && last.type === type && (type === 'input' || type === 'scroll') && last.data.selector === data.selector) {
+            queue.pop();
+        }
+        queue.push({ type: type, time: Date.now(), data: data });
+        if (immediate) {
+            flush();
+        }
+    }
+    var lastClick = null;
+    document.addEventListener('click', function (event) {
+        lastClick = { target: event.target, time: Date.now() };
+        enqueue('click', { selector: selectorFor(event.target), x: event.clientX, y: event.clientY }, true);
+    }, true);
+    ['input', 'change'].forEach(function (type) {
+        document.addEventListener(type, function (event) {
+            if (event.target && 'value' in event.target) {
+                var data = valueOf(event.target);
+                data.selector = selectorFor(event.target);
+                enqueue(type, data, type === 'change');
+            }
+        }, true);
+    });
+    document.addEventListener('submit', function (event) {
+        var clicked = lastClick && Date.now() - lastClick.time < 100 && event.target.contains(lastClick.target);
+        if (!clicked) {
+            enqueue('submit', { selector: selectorFor(event.target) }, true);
+        }
+    }, true);
+    document.addEventListener('scroll', function (event) {
+        var target = event.target === document ? null : event.target;
+        enqueue('scroll', target ? { selector: selectorFor(target), x: target.scrollLeft, y: target.scrollTop } : { selector: null, x: window.scrollX, y: window.scrollY }, false);
+    }, true);
+    window.addEventListener('pagehide', flush, true);
+    window.__toolskitchCapture = { flush: flush, drain: drain, selectorFor: selectorFor };
+    new QWebChannel(qt.webChannelTransport, function (channel) {
+        bridge = channel.objects.toolskitch;
+        setInterval(flush, options.flush_interval_ms);
+    });
+})();
+"""
+DOM_READY_JS = """
+(function (selector, idleMs) {
+    if (document.readyState !== 'complete') {
+        return false;
+    }
+    if (selector && !document.querySelector(selector)) {
+        return false;
+    }
+    if (idleMs > 0) {
+        var entries = performance.getEntriesByType('resource');
+        var lastResponse = 0;
+        for (var i = 0; i < entries.length; i++) {
+            lastResponse = Math.max(lastResponse, entries[i].responseEnd);
+        }
+        if (performance.now() - lastResponse < idleMs) {
+            return false;
+        }
+    }
+    return true;
+})(%s, %s)
+"""
+KEYFRAME_JS = """
+(function (maxBytes) {
+    if (maxBytes <= 0) {
+        return { url: location.href, scroll: { x: window.scrollX, y: window.scrollY }, dom: null, dom_size: 0 };
+    }
+    var clone = document.documentElement.cloneNode(true);
+    var source = document.documentElement.querySelectorAll('input, textarea, select');
+    var target = clone.querySelectorAll('input, textarea, select');
+    for (var i = 0; i < source.length && i < target.length; i++) {
+        var element = source[i], copy = target[i];
+        if (element.type === 'password') {
+            continue;
+        }
+        if (element.type === 'checkbox' || element.type === 'radio') {
+            if (element.checked) {
+                copy.setAttribute('checked', '');
+            } else {
+                copy.removeAttribute('checked');
+            }
+        } else if (element.tagName === 'TEXTAREA') {
+            copy.textContent = element.value;
+        } else if (element.tagName === 'SELECT') {
+            for (var j = 0; j < element.options.length; j++) {
+                if (element.options[j].selected) {
+                    copy.options[j].setAttribute('selected', '');
+                } else {
+                    copy.options[j].removeAttribute('selected');
+                }
+            }
+        } else {
+            copy.setAttribute('value', element.value);
+        }
+    }
+    Array.prototype.forEach.call(clone.querySelectorAll('script'), function (script) {
+        script.parentNode.removeChild(script);
+    });
+    var html = '<!DOCTYPE html>' + clone.outerHTML;
+    return { url: location.href, scroll: { x: window.scrollX, y: window.scrollY }, dom: html.length <= maxBytes ? html : null, dom_size: html.length };
+})(%s)
+"""
+RESTORE_KEYFRAME_JS = """
+(function (html, scroll) {
+    if (html) {
+        document.open();
+        document.write(html);
+        document.close();
+    }
+    if (scroll) {
+        window.scrollTo(scroll.x || 0, scroll.y || 0);
+    }
+    return true;
+})(%s, %s)
+"""
+NAVIGATION_TIMING_JS = """
+(function () {
+    var result = {};
+    var navigation = performance.getEntriesByType('navigation')[0];
+    if (navigation) {
+        result.ttfb = navigation.responseStart - navigation.requestStart;
+        result.response_end = navigation.responseEnd;
+        result.dom_interactive = navigation.domInteractive;
+        result.dom_content_loaded = navigation.domContentLoadedEventEnd;
+        result.load_event = navigation.loadEventEnd;
+        result.transfer_size = navigation.transferSize;
+    } else if (performance.timing) {
+        var timing = performance.timing;
+        result.ttfb = timing.responseStart - timing.requestStart;
+        result.response_end = timing.responseEnd - timing.navigationStart;
+        result.dom_interactive = timing.domInteractive - timing.navigationStart;
+        result.dom_content_loaded = timing.domContentLoadedEventEnd - timing.navigationStart;
+        result.load_event = Math.max(0, timing.loadEventEnd - timing.navigationStart);
+    }
+    performance.getEntriesByType('paint').forEach(function (entry) {
+        result[entry.name.replace(/-/g, '_')] = entry.startTime;
+    });
+    return result;
+})()
+"""
+LOG_CATEGORIES = [("All", ""), ("Recording", "recording"), ("Replay", "replay"), ("Navigation", "navigation"), ("Errors", "error"), ("Application", "app")]
+REPORT_EXTENSIONS = ('.metrics.json', '.summary.json', '.diff.json')
+HTTP_CACHE_TYPES = {'disk': QWebEngineProfile.DiskHttpCache, 'memory': QWebEngineProfile.MemoryHttpCache, 'none': QWebEngineProfile.NoCache}
+COOKIE_POLICIES = {'persistent': QWebEngineProfile.ForcePersistentCookies, 'allow': QWebEngineProfile.AllowPersistentCookies, 'session': QWebEngineProfile.NoPersistentCookies}
+REPLAY_CACHE_MODES = [("Keep cache", "keep"), ("Cold cache", "cold"), ("Warm cache", "warm")]
+CACHE_DIRECTORY_SUFFIX = ".cache"
+HOP_BY_HOP_HEADERS = {'connection', 'keep-alive', 'proxy-connection', 'proxy-authenticate', 'proxy-authorization', 'te', 'trailer', 'trailers', 'transfer-encoding', 'upgrade', 'content-encoding', 'content-length'}
+COMPARE_EVENT_TYPES = ('navigation', 'navigation_request', 'page_loaded', 'click', 'input', 'change', 'submit')
+COMPARE_FILTERS = [("All changes", ""), ("Slower", "slower"), ("Faster", "faster"), ("Added", "added"), ("Removed", "removed")]
+SESSION_EXTENSIONS = tuple(extension + suffix for extension in ('.json', JOURNAL_EXTENSION, BINARY_EXTENSION) for suffix in ('', '.gz', '.zst'))
+APP_STYLESHEET = """
+QLabel#logo {
+    background-color: transparent;
+    border: none;
+    color: #2a82da;
+}
+QLabel#previewTitle {
+    color: #2a82da;
+    margin-bottom: 10px;
+}
+QLabel#browserPlaceholder {
+    color: #666666;
+    font-size: 14px;
+}
+QLabel[role="section"] {
+    color: white;
+    margin-top: 10px;
+}
+QPushButton {
+    background-color: #404040;
+    border: none;
+    border-radius: 5px;
+    padding: 8px 16px;
+    color: white;
+    font-weight: bold;
+}
+QPushButton:hover {
+    background-color: #505050;
+}
+QPushButton:pressed {
+    background-color: #303030;
+}
+QPushButton:disabled {
+    background-color: #2a2a2a;
+    color: #666666;
+}
+QPushButton[variant="primary"] {
+    background-color: #2a82da;
+}
+QPushButton[variant="primary"]:hover {
+    background-color: #1e6bb8;
+}
+QPushButton[variant="primary"]:pressed {
+    background-color: #155a9e;
+}
+QPushButton[variant="danger"] {
+    background-color: #ff4444;
+}
+QPushButton[variant="danger"]:hover {
+    background-color: #cc3333;
+}
+#toolbar QPushButton {
+    font-size: 14px;
+}
+#toolbar QLineEdit {
+    background-color: #2a2a2a;
+    border: 2px solid #404040;
+    border-radius: 5px;
+    padding: 8px;
+    color: white;
+    font-size: 14px;
+}
+QLineEdit:focus, QTextEdit:focus {
+    border: 2px solid #2a82da;
+}
+QTextEdit {
+    background-color: #1a1a1a;
+    border: 2px solid #404040;
+    border-radius: 5px;
+    padding: 10px;
+    color: #cccccc;
+    font-size: 12px;
+}
+QComboBox {
+    background-color: #2a2a2a;
+    border: 2px solid #404040;
+    border-radius: 5px;
+    padding: 6px;
+    color: white;
+}
+#libraryPanel QLineEdit, #libraryPanel QListWidget, #logPanel QListView {
+    background-color: #1a1a1a;
+    border: 2px solid #404040;
+    border-radius: 5px;
+    padding: 6px;
+    color: #cccccc;
+    font-size: 11px;
+}
+#libraryPanel QLineEdit:focus {
+    border: 2px solid #2a82da;
+}
+#logPanel QListView {
+    padding: 8px;
+}
+#comparisonDialog QLabel {
+    color: white;
+}
+#comparisonDialog QListView {
+    background-color: #1a1a1a;
+    border: 2px solid #404040;
+    border-radius: 5px;
+    padding: 8px;
+    color: #cccccc;
+    font-size: 11px;
+}
+#logPanel QComboBox {
+    padding: 4px;
+}
+"""
+CATALOG_FILENAME = ".toolskitch_catalog.sqlite"
+CATALOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    start_time TEXT,
+    duration REAL,
+    event_count INTEGER,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS event_counts (
+    session_id INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    type TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (session_id, type)
+);
+CREATE TABLE IF NOT EXISTS urls (
+    session_id INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    url TEXT NOT NULL,
+    hits INTEGER NOT NULL,
+    PRIMARY KEY (session_id, url)
+);
+CREATE INDEX IF NOT EXISTS urls_by_url ON urls(url);
+CREATE INDEX IF NOT EXISTS event_counts_by_type ON event_counts(type);
+"""
+SESSION_FILE_FILTER = "Session Journals (*.tsj *.tsj.gz *.tsj.zst);;Binary Sessions (*.tsb *.tsb.gz *.tsb.zst);;JSON Files (*.json *.json.gz *.json.zst)"
+
+def load_config(path=CONFIG_PATH):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def resolve_path(path):
+    return path if os.path.isabs(path) else os.path.join(APP_DIR, path)
+
+def report_path(config, name):
+    directory = resolve_path(config.get('sessions', {}).get('report_directory', os.path.join('sessions', 'reports')))
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, name)
+
+def compression_for_filename(filename):
+    lowered = filename.lower()
+    for compression, suffix in COMPRESSION_SUFFIXES.items():
+        if lowered.endswith(suffix):
+            return compression
+    return None
+
+def base_filename(filename):
+    compression = compression_for_filename(filename)
+    return filename[:-len(COMPRESSION_SUFFIXES[compression])] if compression else filename
+
+def sniff_compression(filename):
+    with open(filename, 'rb') as f:
+        magic = f.read(4)
+    if magic.startswith(GZIP_MAGIC):
+        return 'gzip'
+    if magic == ZSTD_MAGIC:
+        return 'zstd'
+    return None
+
+def open_compressed(filename, mode='rb', compression=None, level=None):
+    writing = mode.startswith('w')
+    if compression is None:
+        compression = compression_for_filename(filename) if writing else sniff_compression(filename)
+    if compression == 'gzip':
+        stream = gzip.open(filename, 'wb' if writing else 'rb', compresslevel=level or 6)
+    elif compression == 'zstd':
+        if zstandard is None:
+            raise ValueError("zstd compressed sessions require the 'zstandard' package")
+        raw = open(filename, 'wb' if writing else 'rb')
+        stream = zstandard.ZstdCompressor(level=level or 3).stream_writer(raw) if writing else zstandard.ZstdDecompressor().stream_reader(raw)
+    else:
+        stream = open(filename, 'wb' if writing else 'rb')
+    return io.TextIOWrapper(stream, encoding='utf-8') if mode.endswith('t') else stream
+
+def sniff_session_format(filename):
+    with open_compressed(filename, 'rb') as f:
+        if f.read(len(BINARY_MAGIC)) == BINARY_MAGIC:
+            return 'binary'
+    with open_compressed(filename, 'rt') as f:
+        try:
+            first_line = f.readline(65536)
+        except TRUNCATION_ERRORS:
+            first_line = ''
+    try:
+        header = json.loads(first_line)
+    except ValueError:
+        return 'json'
+    if isinstance(header, dict) and header.get('journal') == 'header':
+        return 'journal'
+    return 'json'
+
+def iter_journal(filename):
+    with open_compressed(filename, 'rt') as f:
+        try:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    return
+                yield record
+        except TRUNCATION_ERRORS:
+            return
+
+def read_journal(filename):
+    session_data = {'start_time': None, 'events': [], 'complete': False}
+    for record in iter_journal(filename):
+        kind = record.get('journal')
+        if kind is None:
+            session_data['events'].append(record)
+        elif kind == 'header':
+            session_data['start_time'] = record.get('start_time')
+        elif kind == 'end':
+            session_data['complete'] = True
+    return session_data
+
+class BinarySessionWriter:
+    def __init__(self, filename, start_time, level=None, compression=None):
+        self.file = open_compressed(filename, 'wb', compression or compression_for_filename(filename), level)
+        self.position = 0
+        self.strings = {}
+        self.offsets = array('Q')
+        metadata = json.dumps({'start_time': start_time}).encode('utf-8')
+        self.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, 0))
+        self.write(struct.pack('<I', len(metadata)) + metadata)
+    def write(self, data):
+        self.file.write(data)
+        self.position += len(data)
+    def intern(self, value):
+        if value not in self.strings:
+            self.strings[value] = len(self.strings)
+        return self.strings[value]
+    def add(self, event):
+        rest = {key: value for key, value in event.items() if key not in ('timestamp', 'type')}
+        data = dict(rest.get('data') or {})
+        url = data.pop('url', None)
+        url_id = self.intern(url) if isinstance(url, str) else NO_STRING
+        if url_id == NO_STRING and url is not None:
+            data['url'] = url
+        rest['data'] = data
+        blob = json.dumps(rest, separators=(',', ':')).encode('utf-8') if rest != {'data': {}} else b''
+        self.offsets.append(self.position)
+        self.write(BINARY_EVENT.pack(float(event.get('timestamp', 0.0)), self.intern(event['type']), url_id, len(blob)) + blob)
+    def close(self):
+        strings_offset = self.position
+        table = [struct.pack('<I', len(self.strings))]
+        for value in self.strings:
+            encoded = value.encode('utf-8')
+            table.append(struct.pack('<I', len(encoded)) + encoded)
+        self.write(b''.join(table))
+        index_offset = self.position
+        self.write(self.offsets.tobytes() if sys.byteorder == 'little' else struct.pack(f'<{len(self.offsets)}Q', *self.offsets))
+        self.write(BINARY_FOOTER.pack(strings_offset, index_offset, len(self.offsets), BINARY_END_MAGIC))
+        self.file.close()
+
+class BinarySession(Sequence):
+    def __init__(self, filename):
+        self.filename = filename
+        compression = sniff_compression(filename)
+        self.backing = None
+        if compression:
+            self.backing = tempfile.TemporaryFile()
+            with open_compressed(filename, 'rb', compression) as source:
+                shutil.copyfileobj(source, self.backing, 1 << 20)
+            self.backing.flush()
+            self.map = mmap.mmap(self.backing.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            with open(filename, 'rb') as f:
+                self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _ = BINARY_HEADER.unpack_from(self.map, 0)
+        if magic != BINARY_MAGIC or version != BINARY_VERSION:
+            raise ValueError(f"Unsupported binary session: {filename}")
+        strings_offset, self.index_offset, self.count, end_magic = BINARY_FOOTER.unpack_from(self.map, len(self.map) - BINARY_FOOTER.size)
+        if end_magic != BINARY_END_MAGIC:
+            raise ValueError(f"Truncated binary session: {filename}")
+        metadata_length, = struct.unpack_from('<I', self.map, BINARY_HEADER.size)
+        metadata_offset = BINARY_HEADER.size + 4
+        self.metadata = json.loads(self.map[metadata_offset:metadata_offset + metadata_length])
+        self.strings = []
+        position = strings_offset + 4
+        for _ in range(struct.unpack_from('<I', self.map, strings_offset)[0]):
+            length, = struct.unpack_from('<I', self.map, position)
+            self.strings.append(self.map[position + 4:position + 4 + length].decode('utf-8'))
+            position += 4 + length
+    def __len__(self):
+        return self.count
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("event index out of range")
+        offset, = struct.unpack_from('<Q', self.map, self.index_offset + 8 * index)
+        timestamp, type_id, url_id, blob_length = BINARY_EVENT.unpack_from(self.map, offset)
+        blob_offset = offset + BINARY_EVENT.size
+        event = json.loads(self.map[blob_offset:blob_offset + blob_length]) if blob_length else {'data': {}}
+        event['timestamp'] = timestamp
+        event['type'] = self.strings[type_id]
+        if url_id != NO_STRING:
+            event['data']['url'] = self.strings[url_id]
+        return event
+    def close(self):
+        self.map.close()
+        if self.backing:
+            self.backing.close()
+
+def open_session(filename):
+    session_format = sniff_session_format(filename)
+    if session_format == 'binary':
+        events = BinarySession(filename)
+        return {'start_time': events.metadata.get('start_time'), 'events': events}
+    if session_format == 'journal':
+        return read_journal(filename)
+    with open_compressed(filename, 'rt') as f:
+        return json.load(f)
+
+def iter_session(filename):
+    if sniff_session_format(filename) == 'journal':
+        records = iter_journal(filename)
+        header = next(records, {})
+        return header.get('start_time'), (record for record in records if 'journal' not in record)
+    session_data = open_session(filename)
+    return session_data['start_time'], iter(session_data['events'])
+
+def write_session(filename, start_time, events, level=None):
+    base = base_filename(filename).lower()
+    partial = filename + '.partial'
+    if base.endswith(BINARY_EXTENSION):
+        writer = BinarySessionWriter(partial, start_time, level, compression_for_filename(filename))
+        for event in events:
+            writer.add(event)
+        writer.close()
+    elif base.endswith(JOURNAL_EXTENSION):
+        with open_compressed(partial, 'wt', compression_for_filename(filename), level) as f:
+            f.write(json.dumps({'journal': 'header', 'format': JOURNAL_FORMAT, 'version': 1, 'start_time': start_time}, separators=(',', ':')) + '\n')
+            count = 0
+            for event in events:
+                f.write(json.dumps(event, separators=(',', ':')) + '\n')
+                count += 1
+            f.write(json.dumps({'journal': 'end', 'event_count': count, 'time': time.time()}, separators=(',', ':')) + '\n')
+    else:
+        with open_compressed(partial, 'wt', compression_for_filename(filename), level) as f:
+            f.write('{\n  "start_time": %s,\n  "events": [' % json.dumps(start_time))
+            separator = '\n    '
+            for event in events:
+                f.write(separator + json.dumps(event))
+                separator = ',\n    '
+            f.write('\n  ]\n}\n')
+    os.replace(partial, filename)
+
+def convert_session(source, destination, level=None):
+    start_time, events = iter_session(source)
+    write_session(destination, start_time, events, level)
+
+class SessionJournal:
+    def __init__(self, filename, start_time, checkpoint_interval=30, batch_size=500, level=None):
+        self.filename = filename
+        self.checkpoint_interval = checkpoint_interval
+        self.batch_size = batch_size
+        self.event_count = 0
+        self.queue = queue.Queue()
+        self.file = open_compressed(filename, 'wt', level=level)
+        self.write_records([{'journal': 'header', 'format': JOURNAL_FORMAT, 'version': 1, 'start_time': datetime.fromtimestamp(start_time).isoformat()}])
+        self.writer = threading.Thread(target=self.writer_loop, name="SessionJournalWriter", daemon=True)
+        self.writer.start()
+    def append(self, event):
+        self.queue.put(event)
+    def write_records(self, records):
+        self.file.write(''.join(json.dumps(record, separators=(',', ':')) + '\n' for record in records))
+        self.file.flush()
+    def checkpoint(self):
+        self.write_records([{'journal': 'checkpoint', 'event_count': self.event_count, 'time': time.time()}])
+        os.fsync(self.file.fileno())
+    def writer_loop(self):
+        next_checkpoint = time.monotonic() + self.checkpoint_interval
+        running = True
+        while running:
+            batch = []
+            try:
+                item = self.queue.get(timeout=max(0.0, min(1.0, next_checkpoint - time.monotonic())))
+                while item is not None:
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    item = self.queue.get_nowait()
+                running = item is not None
+            except queue.Empty:
+                pass
+            if batch:
+                self.write_records(batch)
+                self.event_count += len(batch)
+            if time.monotonic() >= next_checkpoint:
+                self.checkpoint()
+                next_checkpoint = time.monotonic() + self.checkpoint_interval
+    def close(self):
+        if self.file.closed:
+            return
+        self.queue.put(None)
+        self.writer.join()
+        self.write_records([{'journal': 'end', 'event_count': self.event_count, 'time': time.time()}])
+        os.fsync(self.file.fileno())
+        self.file.close()
+
+class CapturePolicy:
+    def __init__(self, recording_config=None):
+        recording_config = recording_config or {}
+        self.enabled = {
+            'console_message': recording_config.get('capture_console_messages', True),
+            'navigation': recording_config.get('capture_navigation', True),
+            'navigation_request': recording_config.get('capture_navigation', True),
+            'click': recording_config.get('capture_clicks', True),
+            'input': recording_config.get('capture_inputs', True),
+            'change': recording_config.get('capture_inputs', True),
+            'submit': recording_config.get('capture_inputs', True),
+            'scroll': recording_config.get('capture_scroll', True),
+        }
+        self.console_min_level = recording_config.get('console_min_level', 0)
+        self.console_exclude = [re.compile(pattern) for pattern in recording_config.get('console_exclude_patterns', [])]
+        self.url_exclude = [re.compile(pattern) for pattern in recording_config.get('url_exclude_patterns', [])]
+        self.rate_limits = recording_config.get('rate_limits', {})
+        self.dedupe_window = recording_config.get('dedupe_window', 5.0)
+        self.reset()
+    def reset(self):
+        self.buckets = {}
+        self.dropped = Counter()
+        self.repeat_key = None
+        self.repeat_event = None
+        self.repeat_count = 0
+    def drop(self, event_type, reason):
+        self.dropped[f"{event_type}:{reason}"] += 1
+        return []
+    def allow_rate(self, event_type, timestamp):
+        rate = self.rate_limits.get(event_type)
+        if not rate:
+            return True
+        tokens, last = self.buckets.get(event_type, (rate, timestamp))
+        tokens = min(rate, tokens + (timestamp - last) * rate)
+        allowed = tokens >= 1
+        self.buckets[event_type] = (tokens - 1 if allowed else tokens, timestamp)
+        return allowed
+    def flush(self, timestamp=None):
+        released = []
+        if self.repeat_count:
+            summary = dict(self.repeat_event, data=dict(self.repeat_event['data'], repeat_count=self.repeat_count, last_repeat=self.repeat_event['timestamp']))
+            if timestamp is not None:
+                summary['timestamp'] = max(summary['timestamp'], timestamp)
+            released.append(summary)
+        self.repeat_key = None
+        self.repeat_event = None
+        self.repeat_count = 0
+        return released
+    def admit(self, event):
+        event_type, data, timestamp = event['type'], event['data'], event['timestamp']
+        if not self.enabled.get(event_type, True):
+            return self.drop(event_type, 'disabled')
+        if event_type == 'console_message':
+            if data.get('level', 0) < self.console_min_level:
+                return self.drop(event_type, 'level')
+            if any(pattern.search(str(data.get('message', ''))) for pattern in self.console_exclude):
+                return self.drop(event_type, 'pattern')
+            key = (data.get('level'), data.get('message'), data.get('source'))
+            if key == self.repeat_key and timestamp - self.repeat_event['timestamp'] <= self.dedupe_window:
+                self.repeat_event = event
+                self.repeat_count += 1
+                return self.drop(event_type, 'duplicate')
+        elif 'url' in data and any(pattern.search(str(data['url'])) for pattern in self.url_exclude):
+            return self.drop(event_type, 'pattern')
+        if not self.allow_rate(event_type, timestamp):
+            return self.drop(event_type, 'rate_limit')
+        if event_type != 'console_message':
+            return [event]
+        released = self.flush(timestamp)
+        self.repeat_key = key
+        self.repeat_event = event
+        return released + [event]
+    def dropped_summary(self):
+        return ", ".join(f"{key} {count}" for key, count in sorted(self.dropped.items()))
+
+class SessionBackups:
+    def __init__(self, directory, max_files=10, max_bytes=None):
+        self.directory = directory
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+    def backup(self, filename):
+        if not os.path.isfile(filename):
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        target = os.path.join(self.directory, f"{os.path.basename(filename)}.{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.bak")
+        shutil.copyfile(filename, target)
+        self.prune()
+        return target
+    def prune(self):
+        backups = sorted((os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith('.bak')), key=lambda path: os.path.basename(path).rsplit('.', 2)[-2], reverse=True)
+        total = 0
+        for index, path in enumerate(backups):
+            total += os.path.getsize(path)
+            if index >= self.max_files or (self.max_bytes and total > self.max_bytes and index > 0):
+                os.remove(path)
+
+def session_cache_directory(filename):
+    return os.path.splitext(base_filename(filename))[0] + CACHE_DIRECTORY_SUFFIX
+
+def url_origin(url):
+    parts = urlsplit(url or '')
+    return f"{parts.scheme}://{parts.netloc}" if parts.netloc else ''
+
+def uncached_origins(cache, urls):
+    return sorted({url_origin(url) for url in urls} - cache.origins() - {''})
+
+class NetworkCache:
+    def __init__(self, directory, max_body_bytes=None):
+        self.directory = directory
+        self.index_path = os.path.join(directory, 'index.json')
+        self.max_body_bytes = max_body_bytes
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                self.entries = json.load(f)
+    def __len__(self):
+        return len(self.entries)
+    def origins(self):
+        with self.lock:
+            return {url_origin(entry['url']) for entry in self.entries.values()}
+    @staticmethod
+    def request_key(method, url, body=b''):
+        return hashlib.sha256(f"{method} {url}\n".encode('utf-8') + (body or b'')).hexdigest()
+    def object_path(self, digest):
+        return os.path.join(self.directory, 'objects', digest[:2], digest)
+    def store(self, method, url, body, status, reason, headers, content):
+        if self.max_body_bytes and len(content) > self.max_body_bytes:
+            return False
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            partial = f"{path}.{threading.get_ident()}.partial"
+            with open(partial, 'wb') as f:
+                f.write(content)
+            os.replace(partial, path)
+        with self.lock:
+            self.entries[self.request_key(method, url, body)] = {'method': method, 'url': url, 'status': status, 'reason': reason, 'headers': headers, 'body': digest, 'size': len(content)}
+        return True
+    def lookup(self, method, url, body=b''):
+        key = self.request_key(method, url, body)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        with open(self.object_path(entry['body']), 'rb') as f:
+            return entry, f.read()
+    def flush(self):
+        with self.lock:
+            data = json.dumps(self.entries)
+        os.makedirs(self.directory, exist_ok=True)
+        partial = self.index_path + '.partial'
+        with open(partial, 'w') as f:
+            f.write(data)
+        os.replace(partial, self.index_path)
+    def export(self, directory, move=False):
+        self.flush()
+        if os.path.abspath(directory) == os.path.abspath(self.directory):
+            return self
+        if move and not os.path.exists(directory):
+            shutil.move(self.directory, directory)
+            self.directory = directory
+            self.index_path = os.path.join(directory, 'index.json')
+            return self
+        target = NetworkCache(directory, self.max_body_bytes)
+        for root, _, names in os.walk(os.path.join(self.directory, 'objects')):
+            for name in names:
+                path = target.object_path(name)
+                if not name.endswith('.partial') and not os.path.exists(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    shutil.copy2(os.path.join(root, name), path)
+        with target.lock:
+            target.entries.update(self.entries)
+        target.flush()
+        return target
+
+class CachingProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    def do_CONNECT(self):
+        self.server.proxy.tunnel(self)
+    def do_GET(self):
+        self.server.proxy.forward(self)
+    do_HEAD = do_POST = do_PUT = do_PATCH = do_DELETE = do_OPTIONS = do_GET
+    def log_message(self, format, *args):
+        pass
+
+class CachingProxy:
+    def __init__(self, cache, mode='record', offline=False, port=0, timeout=30):
+        self.cache = cache
+        self.mode = mode
+        self.offline = offline
+        self.timeout = timeout
+        self.local = threading.local()
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), CachingProxyHandler)
+        self.server.daemon_threads = True
+        self.server.proxy = self
+        self.thread = None
+    @property
+    def port(self):
+        return self.server.server_address[1]
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="CachingProxy", daemon=True)
+        self.thread.start()
+        return self
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self.mode == 'record':
+            self.cache.flush()
+    def http_session(self):
+        if not hasattr(self.local, 'session'):
+            self.local.session = requests.Session()
+            self.local.session.trust_env = False
+        return self.local.session
+    def respond(self, handler, status, reason, headers, content, cache_status):
+        handler.send_response(status, reason)
+        for name, value in headers:
+            handler.send_header(name, value)
+        handler.send_header('Content-Length', str(len(content)))
+        handler.send_header('X-Toolskitch-Cache', cache_status)
+        handler.end_headers()
+        if handler.command != 'HEAD':
+            handler.wfile.write(content)
+    def forward(self, handler):
+        length = int(handler.headers.get('Content-Length') or 0)
+        body = handler.rfile.read(length) if length else b''
+        url = handler.path
+        cached = self.cache.lookup(handler.command, url, body) if self.mode == 'replay' else None
+        if cached:
+            entry, content = cached
+            return self.respond(handler, entry['status'], entry['reason'], entry['headers'], content, 'HIT')
+        if self.offline:
+            return self.respond(handler, 504, 'Not Cached', [('Content-Type', 'text/plain')], f"Not in the session network cache: {url}".encode('utf-8'), 'MISS')
+        headers = {name: value for name, value in handler.headers.items() if name.lower() not in HOP_BY_HOP_HEADERS}
+        try:
+            response = self.http_session().request(handler.command, url, headers=headers, data=body or None, allow_redirects=False, timeout=self.timeout)
+        except requests.RequestException as e:
+            return self.respond(handler, 502, 'Bad Gateway', [('Content-Type', 'text/plain')], str(e).encode('utf-8'), 'ERROR')
+        raw_headers = response.raw.headers
+        headers = [(name, value) for name, value in getattr(raw_headers, 'iteritems', raw_headers.items)() if name.lower() not in HOP_BY_HOP_HEADERS]
+        stored = self.mode == 'record' and self.cache.store(handler.command, url, body, response.status_code, response.reason, headers, response.content)
+        self.respond(handler, response.status_code, response.reason, headers, response.content, 'STORED' if stored else 'MISS')
+    def tunnel(self, handler):
+        if self.offline:
+            return self.respond(handler, 502, 'Offline', [('Content-Type', 'text/plain')], b"HTTPS is not available in offline replay", 'MISS')
+        host, _, port = handler.path.rpartition(':')
+        try:
+            upstream = socket.create_connection((host, int(port)), timeout=self.timeout)
+        except (OSError, ValueError) as e:
+            return self.respond(handler, 502, 'Bad Gateway', [('Content-Type', 'text/plain')], str(e).encode('utf-8'), 'ERROR')
+        handler.send_response(200, 'Connection Established')
+        handler.end_headers()
+        handler.close_connection = True
+        selector = selectors.DefaultSelector()
+        selector.register(handler.connection, selectors.EVENT_READ, upstream)
+        selector.register(upstream, selectors.EVENT_READ, handler.connection)
+        try:
+            while True:
+                ready = selector.select(timeout=self.timeout)
+                if not ready:
+                    return
+                for key, _ in ready:
+                    data = key.fileobj.recv(65536)
+                    if not data:
+                        return
+                    key.data.sendall(data)
+        except OSError:
+            pass
+        finally:
+            selector.close()
+            upstream.close()
+
+def start_network_proxy(cache, mode, network_config=None, offline=False):
+    network_config = network_config or {}
+    proxy = CachingProxy(cache, mode, offline, network_config.get('proxy_port', 0), network_config.get('timeout', 30)).start()
+    QNetworkProxy.setApplicationProxy(QNetworkProxy(QNetworkProxy.HttpProxy, '127.0.0.1', proxy.port))
+    return proxy
+
+def stop_network_proxy(proxy):
+    QNetworkProxy.setApplicationProxy(QNetworkProxy(QNetworkProxy.NoProxy))
+    proxy.stop()
+
+class LiveStats:
+    def __init__(self, window=10, max_messages=1000):
+        self.window = window
+        self.max_messages = max_messages
+        self.reset()
+    def reset(self):
+        self.total = 0
+        self.by_type = Counter()
+        self.buckets = deque()
+        self.window_counts = Counter()
+        self.console_messages = Counter()
+        self.navigations = Counter()
+        self.page_loads = {}
+        self.navigation_started = None
+        self.last_timestamp = 0.0
+        self.version = 0
+    def add(self, event):
+        event_type = event['type']
+        timestamp = event.get('timestamp', 0.0)
+        data = event.get('data') or {}
+        second = max(int(timestamp), self.buckets[-1][0]) if self.buckets else int(timestamp)
+        if not self.buckets or self.buckets[-1][0] != second:
+            self.buckets.append((second, Counter()))
+        while self.buckets[0][0] <= second - self.window:
+            self.window_counts.subtract(self.buckets.popleft()[1])
+        self.buckets[-1][1][event_type] += 1
+        self.window_counts[event_type] += 1
+        self.by_type[event_type] += 1
+        self.total += 1
+        self.last_timestamp = max(self.last_timestamp, timestamp)
+        self.version += 1
+        if event_type == 'console_message':
+            message = str(data.get('message', ''))[:200]
+            if message in self.console_messages or len(self.console_messages) < self.max_messages:
+                self.console_messages[message] += data.get('repeat_count', 1)
+        elif event_type == 'navigation':
+            self.navigations[metrics_url(data.get('url'))] += 1
+            self.navigation_started = timestamp
+        elif event_type == 'page_loaded' and self.navigation_started is not None:
+            duration = (timestamp - self.navigation_started) * 1000
+            self.navigation_started = None
+            url = metrics_url(data.get('url'))
+            count, total, longest = self.page_loads.get(url, (0, 0.0, 0.0))
+            self.page_loads[url] = (count + 1, total + duration, max(longest, duration))
+    def rates(self):
+        span = min(self.window, max(1.0, self.last_timestamp - self.buckets[0][0] + 1)) if self.buckets else 1.0
+        return {event_type: count / span for event_type, count in self.window_counts.items() if count > 0}
 
 class SessionRecorder:
-    def __init__(self):
+    def __init__(self, config=None, tab=None):
+        self.config = load_config() if config is None else config
+        self.tab = tab
+        recording_config = self.config.get('recording', {})
+        self.streaming = recording_config.get('streaming', True)
+        self.checkpoint_interval = recording_config.get('auto_save_interval', 30)
+        sessions_config = self.config.get('sessions', {})
+        self.session_directory = resolve_path(sessions_config.get('default_directory', 'sessions'))
+        self.compression = sessions_config.get('compression', 'gzip')
+        if self.compression == 'zstd' and zstandard is None:
+            self.compression = 'gzip'
+        self.compression_level = sessions_config.get('compression_level')
+        self.backups = SessionBackups(resolve_path(sessions_config.get('backup_directory', os.path.join(self.session_directory, 'backups'))), sessions_config.get('max_backup_files', 10), sessions_config.get('max_backup_size_mb', 500) * 1024 * 1024) if sessions_config.get('auto_backup', False) else None
+        self.max_events = recording_config.get('max_events', 100000)
+        self.policy = CapturePolicy(recording_config)
+        self.stats = LiveStats(recording_config.get('stats_window_s', 10))
+        network_config = self.config.get('network', {})
+        self.capture_network = network_config.get('capture', False)
+        self.max_cache_body = network_config.get('max_body_mb', 20) * 1024 * 1024
+        self.network_cache = None
         self.events = []
+        self.journal = None
+        self.journal_saved = False
         self.is_recording = False
         self.start_time = None
+        self.last_timestamp = 0.0
     def start_recording(self):
-        self.events = []
+        if isinstance(self.events, BinarySession):
+            self.events.close()
+        self.events = deque(maxlen=self.max_events) if self.max_events else []
+        self.policy.reset()
+        self.stats.reset()
         self.is_recording = True
+        self.journal_saved = False
         self.start_time = time.time()
+        self.last_timestamp = 0.0
+        if self.streaming:
+            os.makedirs(self.session_directory, exist_ok=True)
+            name = self.with_compression_suffix(datetime.fromtimestamp(self.start_time).strftime("recording_%Y%m%d_%H%M%S") + (f"_{self.tab}" if self.tab else "") + JOURNAL_EXTENSION)
+            self.journal = SessionJournal(os.path.join(self.session_directory, name), self.start_time, self.checkpoint_interval, level=self.compression_level)
+        else:
+            self.journal = None
+        self.network_cache = NetworkCache(session_cache_directory(self.journal.filename) if self.journal else tempfile.mkdtemp(prefix="toolskitch-cache-"), self.max_cache_body) if self.capture_network else None
     def stop_recording(self):
+        for event in self.policy.flush(self.last_timestamp):
+            self.store_event(event)
         self.is_recording = False
-    def add_event(self, event_type, data):
-        if self.is_recording:
-            event = {'timestamp': time.time() - self.start_time, 'type': event_type, 'data': data}
+        if self.journal:
+            self.journal.close()
+    def store_event(self, event):
+        self.stats.add(event)
+        if self.journal:
+            self.journal.append(event)
+        else:
+            if isinstance(self.events, deque) and len(self.events) == self.events.maxlen:
+                self.policy.drop(self.events[0]['type'], 'ring_buffer')
             self.events.append(event)
+    def add_event(self, event_type, data, wall_time=None):
+        if self.is_recording:
+            self.last_timestamp = max(self.last_timestamp, (wall_time or time.time()) - self.start_time)
+            event = {'timestamp': self.last_timestamp, 'type': event_type, 'data': data}
+            if self.tab:
+                event['tab'] = self.tab
+            for admitted in self.policy.admit(event):
+                self.store_event(admitted)
+    def with_compression_suffix(self, filename):
+        suffix = COMPRESSION_SUFFIXES.get(self.compression)
+        return filename + suffix if suffix and not compression_for_filename(filename) else filename
     def save_session(self, filename):
-        session_data = {'start_time': datetime.fromtimestamp(self.start_time).isoformat(), 'events': self.events}
-        with open(filename, 'w') as f:
-            json.dump(session_data, f, indent=2)
+        if self.backups and not (self.journal and os.path.abspath(filename) == os.path.abspath(self.journal.filename)):
+            self.backups.backup(filename)
+        moved = False
+        if self.journal:
+            self.journal.close()
+            if os.path.abspath(filename) == os.path.abspath(self.journal.filename):
+                pass
+            elif base_filename(filename).lower().endswith(JOURNAL_EXTENSION) and compression_for_filename(filename) == compression_for_filename(self.journal.filename):
+                if self.journal_saved:
+                    shutil.copyfile(self.journal.filename, filename)
+                else:
+                    shutil.move(self.journal.filename, filename)
+                    self.journal.filename = filename
+                    self.journal_saved = moved = True
+            else:
+                convert_session(self.journal.filename, filename, self.compression_level)
+        else:
+            write_session(filename, datetime.fromtimestamp(self.start_time).isoformat(), self.events, self.compression_level)
+        if self.network_cache is not None:
+            self.network_cache = self.network_cache.export(session_cache_directory(filename), moved)
     def load_session(self, filename):
-        with open(filename, 'r') as f:
-            session_data = json.load(f)
+        if isinstance(self.events, BinarySession):
+            self.events.close()
+        session_data = open_session(filename)
+        self.journal = None
         self.events = session_data['events']
+        cache_directory = session_cache_directory(filename)
+        self.network_cache = NetworkCache(cache_directory, self.max_cache_body) if os.path.isdir(cache_directory) else None
         return session_data
 
+class SessionLibrary:
+    def __init__(self, directory, catalog_path=None):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.catalog_path = catalog_path or os.path.join(directory, CATALOG_FILENAME)
+        os.makedirs(os.path.dirname(os.path.abspath(self.catalog_path)), exist_ok=True)
+        connection = self.connect()
+        try:
+            connection.executescript(CATALOG_SCHEMA)
+        finally:
+            connection.close()
+    def connect(self):
+        connection = sqlite3.connect(self.catalog_path, timeout=10)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA foreign_keys = ON")
+        return connection
+    def scan(self, skip=()):
+        files = {os.path.abspath(path) for path in collect_session_files([self.directory])} - {os.path.abspath(path) for path in skip}
+        connection = self.connect()
+        try:
+            known = {row['path']: (row['mtime'], row['size']) for row in connection.execute("SELECT path, mtime, size FROM sessions")}
+            removed = [path for path in known if path not in files]
+            if removed:
+                with connection:
+                    connection.executemany("DELETE FROM sessions WHERE path = ?", [(path,) for path in removed])
+            indexed = 0
+            for path in sorted(files):
+                stat = os.stat(path)
+                if known.get(path) != (stat.st_mtime, stat.st_size):
+                    self.index_file(path, connection, stat)
+                    indexed += 1
+            return indexed, len(removed)
+        finally:
+            connection.close()
+    def index_file(self, path, connection=None, stat=None):
+        path = os.path.abspath(path)
+        stat = stat or os.stat(path)
+        counts = Counter()
+        urls = Counter()
+        start_time = first = last = None
+        try:
+            start_time, events = iter_session(path)
+            for event in events:
+                counts[event['type']] += 1
+                timestamp = event.get('timestamp')
+                if timestamp is not None:
+                    first = timestamp if first is None else min(first, timestamp)
+                    last = timestamp if last is None else max(last, timestamp)
+                url = (event.get('data') or {}).get('url')
+                if isinstance(url, str):
+                    urls[url] += 1
+            event_count = sum(counts.values())
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            counts.clear()
+            urls.clear()
+            event_count = None
+        own_connection = connection is None
+        connection = connection or self.connect()
+        try:
+            with connection:
+                connection.execute("DELETE FROM sessions WHERE path = ?", (path,))
+                cursor = connection.execute("INSERT INTO sessions (path, mtime, size, start_time, duration, event_count, indexed_at) VALUES (?, ?, ?, ?, ?, ?, ?)", (path, stat.st_mtime, stat.st_size, start_time, (last - first) if first is not None else None, event_count, time.time()))
+                connection.executemany("INSERT INTO event_counts (session_id, type, count) VALUES (?, ?, ?)", [(cursor.lastrowid, event_type, count) for event_type, count in counts.items()])
+                connection.executemany("INSERT INTO urls (session_id, url, hits) VALUES (?, ?, ?)", [(cursor.lastrowid, url, hits) for url, hits in urls.items()])
+        finally:
+            if own_connection:
+                connection.close()
+    def search(self, url=None, event_type=None, limit=500):
+        query = "SELECT * FROM sessions s WHERE s.event_count IS NOT NULL"
+        parameters = []
+        if url:
+            query += " AND EXISTS (SELECT 1 FROM urls u WHERE u.session_id = s.id AND u.url LIKE ? ESCAPE '\\')"
+            parameters.append('%' + url.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%')
+        if event_type:
+            query += " AND EXISTS (SELECT 1 FROM event_counts e WHERE e.session_id = s.id AND e.type = ?)"
+            parameters.append(event_type)
+        query += " ORDER BY s.start_time DESC, s.path LIMIT ?"
+        parameters.append(limit)
+        connection = self.connect()
+        try:
+            sessions = [dict(row) for row in connection.execute(query, parameters)]
+            for session in sessions:
+                session['event_counts'] = {row['type']: row['count'] for row in connection.execute("SELECT type, count FROM event_counts WHERE session_id = ?", (session['id'],))}
+            return sessions
+        finally:
+            connection.close()
+
+class ReplayScheduler:
+    def __init__(self, speed=1.0, clock=time.monotonic, sleep=time.sleep, granularity=0.05, interrupted=None):
+        self.speed = speed
+        self.clock = clock
+        self.sleep = sleep
+        self.granularity = granularity
+        self.interrupted = interrupted or (lambda: False)
+        self.origin = None
+        self.base_offset = 0.0
+    def start(self, offset=0.0):
+        self.origin = self.clock()
+        self.base_offset = offset
+    def set_speed(self, speed, offset):
+        self.speed = speed
+        self.start(offset)
+    def target_time(self, offset):
+        return self.origin + (offset - self.base_offset) / self.speed
+    def wait_until(self, offset):
+        if self.speed <= 0:
+            return 0.0
+        target = self.target_time(offset)
+        remaining = target - self.clock()
+        while remaining > 0:
+            if self.interrupted():
+                return None
+            self.sleep(min(remaining, self.granularity))
+            remaining = target - self.clock()
+        return -remaining
+
+def event_offsets(events, default_delay=0.5, start=0):
+    offset = 0.0
+    for index in range(start, len(events)):
+        event = events[index]
+        timestamp = event.get('timestamp')
+        offset = offset + event.get('delay', default_delay) if timestamp is None else timestamp
+        yield index, offset, event
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+def summarize_values(values):
+    ordered = sorted(values)
+    if not ordered:
+        return {'count': 0}
+    return {'count': len(ordered), 'mean': sum(ordered) / len(ordered), 'min': ordered[0], 'p50': percentile(ordered, 0.5), 'p90': percentile(ordered, 0.9), 'p95': percentile(ordered, 0.95), 'p99': percentile(ordered, 0.99), 'max': ordered[-1]}
+
+def metrics_url(url):
+    parts = urlsplit(url or '')
+    return f"{parts.scheme}://{parts.netloc}{parts.path or '/'}" if parts.netloc else (url or '')
+
+class ReplayMetrics:
+    def __init__(self, session=None, cache_mode=None):
+        self.session = session
+        self.cache_mode = cache_mode
+        self.started = time.time()
+        self.by_type = defaultdict(lambda: defaultdict(list))
+        self.by_url = defaultdict(lambda: defaultdict(list))
+        self.batches = defaultdict(list)
+        self.failures = Counter()
+    def record_event(self, event_type, url, latency_ms, ok=True):
+        if latency_ms is not None:
+            self.by_type[event_type]['latency_ms'].append(latency_ms)
+            self.by_url[metrics_url(url)][f'{event_type}_latency_ms'].append(latency_ms)
+        if not ok:
+            self.failures[event_type] += 1
+    def record_batch(self, url, size, latency_ms):
+        self.batches['latency_ms'].append(latency_ms)
+        self.batches['size'].append(size)
+        self.by_url[metrics_url(url)]['dom_batch_latency_ms'].append(latency_ms)
+    def record_page_timing(self, url, timing):
+        if not isinstance(timing, dict):
+            return
+        for name, value in timing.items():
+            if isinstance(value, (int, float)):
+                self.by_url[metrics_url(url)][name].append(value)
+    def report(self):
+        return {
+            'session': self.session,
+            'cache_mode': self.cache_mode,
+            'started': datetime.fromtimestamp(self.started).isoformat(),
+            'duration': time.time() - self.started,
+            'failures': dict(self.failures),
+            'dom_batches': {name: summarize_values(values) for name, values in self.batches.items()},
+            'event_types': {event_type: {name: summarize_values(values) for name, values in series.items()} for event_type, series in sorted(self.by_type.items())},
+            'urls': {url: {name: summarize_values(values) for name, values in series.items()} for url, series in sorted(self.by_url.items())},
+        }
+    def write(self, filename):
+        with open(filename, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+
+def session_steps(events, event_types=COMPARE_EVENT_TYPES):
+    event_types = set(event_types)
+    steps = []
+    url = ''
+    previous = None
+    for index, offset, event in event_offsets(events):
+        data = event.get('data') or {}
+        event_type = event.get('type')
+        if event_type in ('navigation', 'navigation_request', 'page_loaded') and data.get('url'):
+            url = metrics_url(data['url'])
+        if event_type not in event_types:
+            continue
+        steps.append(((event_type, url, data.get('selector')), 0.0 if previous is None else (offset - previous) * 1000, index))
+        previous = offset
+    return steps
+
+def unique_keys(keys, low, high):
+    positions = {}
+    for index in range(low, high):
+        positions[keys[index]] = None if keys[index] in positions else index
+    return positions
+
+def occurrence_keys(keys, low, high):
+    seen = Counter()
+    for index in range(low, high):
+        seen[keys[index]] += 1
+        yield index, (keys[index], seen[keys[index]])
+
+def increasing_pairs(pairs):
+    tails = []
+    tail_indexes = []
+    links = [None] * len(pairs)
+    for index, (_, position) in enumerate(pairs):
+        slot = bisect.bisect_left(tails, position)
+        links[index] = tail_indexes[slot - 1] if slot else None
+        if slot == len(tails):
+            tails.append(position)
+            tail_indexes.append(index)
+        else:
+            tails[slot] = position
+            tail_indexes[slot] = index
+    result = []
+    index = tail_indexes[-1] if tail_indexes else None
+    while index is not None:
+        result.append(pairs[index])
+        index = links[index]
+    return result[::-1]
+
+def middle_snake(a, a_low, a_high, b, b_low, b_high, max_cost=None):
+    n, m = a_high - a_low, b_high - b_low
+    delta = n - m
+    odd = delta % 2
+    limit = (n + m + 1) // 2
+    if max_cost is not None:
+        limit = min(limit, max_cost)
+    forward = {1: 0}
+    backward = {1: 0}
+    for cost in range(limit + 1):
+        for k in range(-cost, cost + 1, 2):
+            x = forward[k + 1] if k == -cost or (k != cost and forward[k - 1] < forward[k + 1]) else forward[k - 1] + 1
+            y = x - k
+            start = x
+            while x < n and y < m and a[a_low + x] == b[b_low + y]:
+                x += 1
+                y += 1
+            forward[k] = x
+            if odd and delta - cost < k < delta + cost and x + backward.get(delta - k, -n - m) >= n:
+                return a_low + start, b_low + start - k, a_low + x, b_low + y
+        for k in range(-cost, cost + 1, 2):
+            x = backward[k + 1] if k == -cost or (k != cost and backward[k - 1] < backward[k + 1]) else backward[k - 1] + 1
+            y = x - k
+            start = x
+            while x < n and y < m and a[a_high - 1 - x] == b[b_high - 1 - y]:
+                x += 1
+                y += 1
+            backward[k] = x
+            if not odd and -cost <= delta - k <= cost and x + forward.get(delta - k, -n - m) >= n:
+                return a_high - x, b_high - y, a_high - start, b_high - start + k
+    return None
+
+def align_sequences(a, b, gap_limit=1000000, edit_limit=2000):
+    matches = []
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        a_low, a_high, b_low, b_high = stack.pop()
+        while a_low < a_high and b_low < b_high and a[a_low] == b[b_low]:
+            matches.append((a_low, b_low))
+            a_low += 1
+            b_low += 1
+        while a_low < a_high and b_low < b_high and a[a_high - 1] == b[b_high - 1]:
+            a_high -= 1
+            b_high -= 1
+            matches.append((a_high, b_high))
+        if a_low == a_high or b_low == b_high:
+            continue
+        unique_a = unique_keys(a, a_low, a_high)
+        unique_b = unique_keys(b, b_low, b_high)
+        anchors = increasing_pairs([(position, unique_b[a[position]]) for position in sorted(position for key, position in unique_a.items() if position is not None and unique_b.get(key) is not None)])
+        if not anchors and (a_high - a_low) * (b_high - b_low) > gap_limit:
+            snake = middle_snake(a, a_low, a_high, b, b_low, b_high, edit_limit)
+            if snake:
+                snake_a, snake_b, end_a, end_b = snake
+                matches.extend((snake_a + offset, snake_b + offset) for offset in range(end_a - snake_a))
+                stack.append((a_low, snake_a, b_low, snake_b))
+                stack.append((end_a, a_high, end_b, b_high))
+                continue
+            occurrences = {key: position for position, key in occurrence_keys(b, b_low, b_high)}
+            anchors = increasing_pairs([(position, occurrences[key]) for position, key in occurrence_keys(a, a_low, a_high) if key in occurrences])
+        if anchors:
+            previous_a, previous_b = a_low, b_low
+            for anchor_a, anchor_b in anchors:
+                matches.append((anchor_a, anchor_b))
+                stack.append((previous_a, anchor_a, previous_b, anchor_b))
+                previous_a, previous_b = anchor_a + 1, anchor_b + 1
+            stack.append((previous_a, a_high, previous_b, b_high))
+        elif (a_high - a_low) * (b_high - b_low) <= gap_limit:
+            matcher = difflib.SequenceMatcher(None, a[a_low:a_high], b[b_low:b_high], autojunk=False)
+            for block in matcher.get_matching_blocks():
+                matches.extend((a_low + block.a + offset, b_low + block.b + offset) for offset in range(block.size))
+    matches.sort()
+    return matches
+
+def step_change(status, key, baseline=None, candidate=None):
+    event_type, url, selector = key
+    change = {'status': status, 'type': event_type, 'url': url, 'selector': selector}
+    if baseline:
+        change['baseline_index'] = baseline[2]
+        change['baseline_ms'] = round(baseline[1], 1)
+    if candidate:
+        change['candidate_index'] = candidate[2]
+        change['candidate_ms'] = round(candidate[1], 1)
+    if baseline and candidate:
+        change['delta_ms'] = round(candidate[1] - baseline[1], 1)
+    return change
+
+def compare_sessions(baseline_events, candidate_events, threshold_ms=100, event_types=COMPARE_EVENT_TYPES, gap_limit=1000000, edit_limit=2000, baseline=None, candidate=None):
+    baseline_steps = session_steps(baseline_events, event_types)
+    candidate_steps = session_steps(candidate_events, event_types)
+    matches = align_sequences([step[0] for step in baseline_steps], [step[0] for step in candidate_steps], gap_limit, edit_limit)
+    changes = []
+    counts = Counter()
+    total_delta = 0.0
+    previous_a = previous_b = 0
+    for index_a, index_b in matches + [(len(baseline_steps), len(candidate_steps))]:
+        for step in baseline_steps[previous_a:index_a]:
+            changes.append(step_change('removed', step[0], baseline=step))
+        for step in candidate_steps[previous_b:index_b]:
+            changes.append(step_change('added', step[0], candidate=step))
+        if index_a < len(baseline_steps):
+            delta = candidate_steps[index_b][1] - baseline_steps[index_a][1]
+            total_delta += delta
+            counts['matched'] += 1
+            if abs(delta) >= threshold_ms:
+                changes.append(step_change('slower' if delta > 0 else 'faster', baseline_steps[index_a][0], baseline_steps[index_a], candidate_steps[index_b]))
+        previous_a, previous_b = index_a + 1, index_b + 1
+    counts.update(change['status'] for change in changes)
+    return {
+        'baseline': baseline,
+        'candidate': candidate,
+        'threshold_ms': threshold_ms,
+        'summary': {'baseline_steps': len(baseline_steps), 'candidate_steps': len(candidate_steps), 'matched': counts['matched'], 'added': counts['added'], 'removed': counts['removed'], 'slower': counts['slower'], 'faster': counts['faster'], 'total_delta_ms': round(total_delta, 1)},
+        'regressions': sorted((change for change in changes if change['status'] == 'slower'), key=lambda change: -change['delta_ms'])[:20],
+        'changes': changes,
+    }
+
+def compare_session_files(baseline, candidate, compare_config=None):
+    compare_config = compare_config or {}
+    baseline_session = open_session(baseline)
+    candidate_session = open_session(candidate)
+    try:
+        return compare_sessions(baseline_session['events'], candidate_session['events'], compare_config.get('threshold_ms', 100), compare_config.get('event_types', COMPARE_EVENT_TYPES), compare_config.get('gap_limit', 1000000), compare_config.get('edit_limit', 2000), baseline, candidate)
+    finally:
+        for session in (baseline_session, candidate_session):
+            if isinstance(session['events'], BinarySession):
+                session['events'].close()
+
+def describe_change(change):
+    target = urlsplit(change['url']).path or change['url'] or '/'
+    step = f"{change['type']} for {target}" + (f" ({change['selector']})" if change['selector'] else '')
+    if change['status'] in ('slower', 'faster'):
+        return f"{step} got {abs(change['delta_ms']):.0f} ms {change['status']}"
+    return f"{step} was {change['status']}"
+
+class KeyframeIndex:
+    def __init__(self, events):
+        self.positions = []
+        self.urls = []
+        url = None
+        for index, event in enumerate(events):
+            event_type = event.get('type')
+            data = event.get('data') or {}
+            if event_type == 'navigation' and data.get('url'):
+                url = data['url']
+            elif event_type == 'page_loaded' and (data.get('url') or url):
+                self.positions.append(index)
+                self.urls.append(data.get('url') or url)
+            elif event_type == 'keyframe' and data.get('url'):
+                self.positions.append(index)
+                self.urls.append(None)
+    def __len__(self):
+        return len(self.positions)
+    def nearest(self, index):
+        position = bisect.bisect_right(self.positions, index) - 1
+        return (self.positions[position], self.urls[position]) if position >= 0 else None
+
+class BrowserDriver(QObject):
+    error_signal = pyqtSignal(str)
+    ready_signal = pyqtSignal(bool, str)
+    def __init__(self, page, replay_config=None):
+        super().__init__()
+        self.page = page
+        replay_config = replay_config or {}
+        self.load_timeout = replay_config.get('load_timeout', 30)
+        self.dom_timeout = replay_config.get('dom_timeout', 10)
+        self.wait_selector = replay_config.get('wait_for_selector', '')
+        self.network_idle_ms = replay_config.get('network_idle_ms', 0)
+        self.restore_dom = replay_config.get('restore_dom', False)
+        self.pending_keyframe = None
+        self.loading = False
+        self.dom_deadline = None
+        self.metrics = None
+        self.navigation_url = None
+        self.navigation_started = None
+        self.load_timer = QTimer(self)
+        self.load_timer.setSingleShot(True)
+        self.load_timer.timeout.connect(self.load_timed_out)
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(100)
+        self.poll_timer.timeout.connect(self.poll_dom)
+        self.page_loading = False
+        page.loadStarted.connect(self.track_load_started)
+        page.loadFinished.connect(self.load_finished)
+    def ready_timeout(self):
+        return self.load_timeout + (self.dom_timeout if self.wait_selector or self.network_idle_ms else 0)
+    def navigate(self, url, force=False):
+        self.navigation_url = url
+        self.navigation_started = time.perf_counter()
+        self.loading = True
+        self.poll_timer.stop()
+        self.load_timer.start(int(self.load_timeout * 1000))
+        if not force and self.page.url() == QUrl(url):
+            if not self.page_loading:
+                self.load_finished(True)
+            return
+        self.page.setUrl(QUrl(url))
+    def restore_keyframe(self, keyframe):
+        self.pending_keyframe = keyframe
+        self.navigate(keyframe['url'], force=True)
+    def track_load_started(self):
+        self.page_loading = True
+    def load_finished(self, ok):
+        self.page_loading = False
+        if not self.loading:
+            return
+        self.loading = False
+        self.load_timer.stop()
+        if not ok:
+            self.finish_navigation(False, "page failed to load")
+        elif self.wait_selector or self.network_idle_ms:
+            self.dom_deadline = time.monotonic() + self.dom_timeout
+            self.poll_timer.start()
+        else:
+            self.finish_navigation(True, "page loaded")
+    def load_timed_out(self):
+        if self.loading:
+            self.loading = False
+            self.finish_navigation(False, f"timed out after {self.load_timeout}s waiting for page load")
+    def finish_navigation(self, ok, detail):
+        keyframe, self.pending_keyframe = self.pending_keyframe, None
+        if keyframe is not None:
+            self.navigation_started = None
+            if ok:
+                self.page.runJavaScript(RESTORE_KEYFRAME_JS % (json.dumps(keyframe.get('dom') if self.restore_dom else None), json.dumps(keyframe.get('scroll'))), lambda _: self.ready_signal.emit(True, "keyframe restored"))
+                return
+        if self.metrics is not None and self.navigation_started is not None:
+            metrics, url = self.metrics, self.navigation_url
+            metrics.record_event('navigation', url, (time.perf_counter() - self.navigation_started) * 1000, ok)
+            if ok:
+                self.page.runJavaScript(NAVIGATION_TIMING_JS, lambda timing: metrics.record_page_timing(url, timing))
+        self.navigation_started = None
+        self.ready_signal.emit(ok, detail)
+    def poll_dom(self):
+        self.page.runJavaScript(DOM_READY_JS % (json.dumps(self.wait_selector), json.dumps(self.network_idle_ms)), self.dom_checked)
+    def dom_checked(self, ready):
+        if not self.poll_timer.isActive():
+            return
+        if ready:
+            self.poll_timer.stop()
+            self.finish_navigation(True, "DOM ready")
+        elif time.monotonic() >= self.dom_deadline:
+            self.poll_timer.stop()
+            self.finish_navigation(False, f"timed out after {self.dom_timeout}s waiting for DOM condition")
+    def run_dom_batch(self, batch, retry=True):
+        payload = json.dumps([{'type': event['type'], 'data': event['data']} for _, event in batch])
+        url = self.page.url().toString()
+        started = time.perf_counter()
+        def report(results):
+            if results is None and retry:
+                self.page.runJavaScript(REPLAY_AGENT_JS)
+                self.run_dom_batch(batch, retry=False)
+                return
+            if self.metrics is not None:
+                self.metrics.record_batch(url, len(batch), (time.perf_counter() - started) * 1000)
+            for (index, event), result in zip(batch, results or [{'ok': False, 'error': 'replay agent unavailable'}] * len(batch)):
+                if self.metrics is not None:
+                    self.metrics.record_event(event['type'], url, result.get('duration'), bool(result.get('ok')))
+                if not result.get('ok'):
+                    self.error_signal.emit(f"Event {index+1} ({event['type']}) failed: {result.get('error')}")
+        self.page.runJavaScript(f"window.__toolskitchReplay ? window.__toolskitchReplay.run({payload}) : null", report)
+
 class SessionReplayer(QThread):
     progress_signal = pyqtSignal(str)
+    error_signal = pyqtSignal(str)
     finished_signal = pyqtSignal()
-    def __init__(self, events, web_view):
+    position_signal = pyqtSignal(int)
+    navigate_signal = pyqtSignal(str, bool)
+    dom_batch_signal = pyqtSignal(list)
+    restore_signal = pyqtSignal(dict)
+    def __init__(self, events, driver, speed=1.0, default_delay=0.5, wait_for_load=True, auto_pause_on_error=False, session=None):
         super().__init__()
         self.events = events
-        self.web_view = web_view
+        self.driver = driver
+        self.metrics = ReplayMetrics(session)
+        driver.metrics = self.metrics
         self.current_index = 0
+        self.dispatched_index = -1
+        self.keyframes = None
+        self.fast_forward_until = None
+        self.after_dom_batch = False
+        self.default_delay = default_delay
+        self.wait_for_load = wait_for_load
+        self.auto_pause_on_error = auto_pause_on_error
+        self.awaiting_load = False
+        self.load_result = None
+        self.control = threading.Condition()
+        self.paused = False
+        self.cancelled = False
+        self.seek_index = None
+        self.pending_speed = None
+        self.scheduler = ReplayScheduler(speed, sleep=self.sleep, interrupted=self.interrupted)
+        self.batch_window = 0.05
+        self.max_batch_size = 100
+        self.navigate_signal.connect(driver.navigate, Qt.QueuedConnection)
+        self.dom_batch_signal.connect(driver.run_dom_batch, Qt.QueuedConnection)
+        self.restore_signal.connect(driver.restore_keyframe, Qt.QueuedConnection)
+        driver.ready_signal.connect(self.page_ready)
+    def set_speed(self, speed):
+        with self.control:
+            self.pending_speed = speed
+            self.control.notify_all()
+    def pause(self):
+        with self.control:
+            self.paused = True
+            self.control.notify_all()
+    def resume(self):
+        with self.control:
+            self.paused = False
+            self.control.notify_all()
+    def seek(self, index):
+        with self.control:
+            self.seek_index = max(0, min(index, len(self.events) - 1))
+            self.control.notify_all()
+    def cancel(self):
+        with self.control:
+            self.cancelled = True
+            self.paused = False
+            self.control.notify_all()
+    def interrupted(self):
+        return self.cancelled or self.paused or self.seek_index is not None or self.pending_speed is not None
+    def sleep(self, seconds):
+        with self.control:
+            self.control.wait_for(self.interrupted, timeout=seconds)
+    def page_ready(self, ok, detail):
+        with self.control:
+            if self.awaiting_load:
+                self.load_result = (ok, detail)
+                self.control.notify_all()
+    def wait_for_page(self):
+        with self.control:
+            self.control.wait_for(lambda: self.load_result is not None or self.cancelled, timeout=self.driver.ready_timeout() + 1)
+            ok, detail = self.load_result or (False, "no response from browser")
+            self.awaiting_load = False
+            self.load_result = None
+        if self.cancelled:
+            return
+        if not ok:
+            self.error_signal.emit(f"Page not ready: {detail}")
+            if self.auto_pause_on_error:
+                self.pause()
+    def prepare_seek(self, index):
+        if self.keyframes is None:
+            self.keyframes = KeyframeIndex(self.events)
+        keyframe = self.keyframes.nearest(index - 1)
+        if index > self.dispatched_index and (keyframe is None or keyframe[0] <= self.dispatched_index):
+            start = self.dispatched_index + 1
+        elif keyframe is None:
+            start = 0
+            self.after_dom_batch = False
+        else:
+            position, url = keyframe
+            with self.control:
+                self.awaiting_load = True
+                self.load_result = None
+            self.restore_signal.emit({'url': url} if url else dict(self.events[position]['data']))
+            self.wait_for_page()
+            self.after_dom_batch = False
+            start = position + 1
+        self.fast_forward_until = index if start < index else None
+        return start
+    def handle_control(self, offset):
+        with self.control:
+            if self.paused:
+                self.progress_signal.emit("Replay paused")
+                self.control.wait_for(lambda: not self.paused or self.cancelled)
+                if not self.cancelled:
+                    self.progress_signal.emit("Replay resumed")
+            speed, self.pending_speed = self.pending_speed, None
+            seek_index, self.seek_index = self.seek_index, None
+        self.scheduler.set_speed(self.scheduler.speed if speed is None else speed, offset)
+        return seek_index
     def run(self):
-        for i, event in enumerate(self.events):
-            self.progress_signal.emit(f"Replaying event {i+1}/{len(self.events)}: {event['type']}")
-            if event['type'] == 'navigation':
-                self.web_view.setUrl(QUrl(event['data']['url']))
-            elif event['type'] == 'click':
-                js_code = f"""
-                var element = document.elementFromPoint({event['data']['x']}, {event['data']['y']});
-                if (element) {{
-                    element.click();
-                }}
-                """
-                self.web_view.page().runJavaScript(js_code)
-            elif event['type'] == 'input':
-                js_code = f"""
-                var element = document.elementFromPoint({event['data']['x']}, {event['data']['y']});
-                if (element && element.tagName === 'INPUT') {{
-                    element.value = '{event['data']['value']}';
-                    element.dispatchEvent(new Event('input', {{ bubbles: true }}));
-                }}
-                """
-                self.web_view.page().runJavaScript(js_code)
-            time.sleep(event.get('delay', 0.5))
+        total = len(self.events)
+        items = event_offsets(self.events, self.default_delay)
+        pending = next(items, None)
+        if pending:
+            self.scheduler.start(pending[1])
+        while pending and not self.cancelled:
+            i, offset, event = pending
+            fast = self.fast_forward_until is not None and i < self.fast_forward_until
+            if self.fast_forward_until is not None and not fast:
+                self.fast_forward_until = None
+                self.scheduler.start(offset)
+            if self.awaiting_load and (event['type'] == 'page_loaded' or event['type'] in DOM_EVENT_TYPES):
+                self.wait_for_page()
+                self.scheduler.start(offset)
+            if self.interrupted() or (not fast and self.scheduler.wait_until(offset) is None):
+                seek_index = self.handle_control(offset)
+                if seek_index is not None:
+                    start = self.prepare_seek(seek_index)
+                    items = event_offsets(self.events, self.default_delay, start)
+                    pending = next(items, None)
+                    if pending:
+                        self.scheduler.start(pending[1])
+                        self.progress_signal.emit(f"Seeked to event {seek_index+1}/{total}" + (f", fast-forwarding from event {start+1}" if start < seek_index else ""))
+                continue
+            self.current_index = i
+            pending = next(items, None)
+            if event['type'] in DOM_EVENT_TYPES:
+                batch = [(i, event)]
+                while pending and pending[2]['type'] in DOM_EVENT_TYPES and len(batch) < self.max_batch_size and (pending[0] < self.fast_forward_until if fast else self.scheduler.speed <= 0 or pending[1] - offset <= self.batch_window * self.scheduler.speed):
+                    batch.append((pending[0], pending[2]))
+                    pending = next(items, None)
+                self.current_index = batch[-1][0]
+                if not fast:
+                    self.progress_signal.emit(f"Replaying events {i+1}-{batch[-1][0]+1}/{total}: {len(batch)} DOM events" if len(batch) > 1 else f"Replaying event {i+1}/{total}: {event['type']}")
+                self.dom_batch_signal.emit(batch)
+                self.after_dom_batch = True
+            else:
+                if not fast:
+                    self.progress_signal.emit(f"Replaying event {i+1}/{total}: {event['type']}")
+                if event['type'] == 'navigation':
+                    with self.control:
+                        self.awaiting_load = self.wait_for_load
+                        self.load_result = None
+                    self.navigate_signal.emit(event['data']['url'], not self.after_dom_batch)
+                    self.after_dom_batch = False
+            self.dispatched_index = self.current_index
+            self.position_signal.emit(self.current_index)
+        if self.awaiting_load and not self.cancelled:
+            self.wait_for_page()
+        self.progress_signal.emit("Replay cancelled" if self.cancelled else "Replay completed")
         self.finished_signal.emit()
 
+def install_replay_agent(page):
+    script = QWebEngineScript()
+    script.setName("toolskitch-replay-agent")
+    script.setSourceCode(REPLAY_AGENT_JS)
+    script.setInjectionPoint(QWebEngineScript.DocumentCreation)
+    script.setWorldId(QWebEngineScript.MainWorld)
+    script.setRunsOnSubFrames(False)
+    page.scripts().insert(script)
+
+@functools.lru_cache(maxsize=1)
+def qwebchannel_source():
+    qwebchannel_file = QFile(":/qtwebchannel/qwebchannel.js")
+    if not qwebchannel_file.open(QIODevice.ReadOnly):
+        return ""
+    source = bytes(qwebchannel_file.readAll()).decode('utf-8')
+    qwebchannel_file.close()
+    return source
+
+class CaptureBridge(QObject):
+    recording_changed = pyqtSignal(bool)
+    def __init__(self, recorder, parent=None):
+        super().__init__(parent)
+        self.recorder = recorder
+    @pyqtProperty(bool, notify=recording_changed)
+    def recording(self):
+        return self.recorder.is_recording
+    def update_recording(self):
+        self.recording_changed.emit(self.recorder.is_recording)
+    @pyqtSlot(str)
+    def capture(self, payload):
+        try:
+            batch = json.loads(payload)
+        except ValueError:
+            return
+        received = time.time()
+        sent = batch.get('now', 0)
+        for item in batch.get('events', []):
+            if item.get('type') in DOM_EVENT_TYPES:
+                self.recorder.add_event(item['type'], item.get('data') or {}, received - max(0, sent - item.get('time', sent)) / 1000)
+
+def install_capture_agent(page, recorder, recording_config=None):
+    recording_config = recording_config or {}
+    bridge = CaptureBridge(recorder, page)
+    channel = QWebChannel(page)
+    channel.registerObject("toolskitch", bridge)
+    page.setWebChannel(channel, QWebEngineScript.ApplicationWorld)
+    options = {'flush_interval_ms': recording_config.get('capture_flush_interval_ms', 250), 'mask_passwords': recording_config.get('mask_passwords', True)}
+    script = QWebEngineScript()
+    script.setName("toolskitch-capture-agent")
+    script.setSourceCode(qwebchannel_source() + CAPTURE_AGENT_JS % json.dumps(options))
+    script.setInjectionPoint(QWebEngineScript.DocumentCreation)
+    script.setWorldId(QWebEngineScript.ApplicationWorld)
+    script.setRunsOnSubFrames(False)
+    page.scripts().insert(script)
+    return bridge
+
+def browser_profile(profile_config=None):
+    profile_config = profile_config or {}
+    if not profile_config.get('name'):
+        return QWebEngineProfile.defaultProfile()
+    return named_profile(profile_config['name'], resolve_path(profile_config.get('storage_directory', '.profiles')), profile_config.get('cache_type', 'disk'), profile_config.get('cache_size_mb', 200), profile_config.get('cookies', 'persistent'))
+
+@functools.lru_cache(maxsize=None)
+def named_profile(name, storage_directory, cache_type, cache_size_mb, cookies):
+    profile = QWebEngineProfile(name, QApplication.instance())
+    path = os.path.join(storage_directory, name)
+    profile.setPersistentStoragePath(path)
+    profile.setCachePath(os.path.join(path, 'cache'))
+    profile.setHttpCacheType(HTTP_CACHE_TYPES.get(cache_type, QWebEngineProfile.DiskHttpCache))
+    profile.setHttpCacheMaximumSize(int(cache_size_mb * 1024 * 1024))
+    profile.setPersistentCookiesPolicy(COOKIE_POLICIES.get(cookies, QWebEngineProfile.ForcePersistentCookies))
+    return profile
+
+def session_urls(events):
+    return list(dict.fromkeys(event['data']['url'] for event in events if event.get('type') == 'navigation' and (event.get('data') or {}).get('url')))
+
+class CacheWarmer(QObject):
+    progress_signal = pyqtSignal(str)
+    finished_signal = pyqtSignal(int)
+    def __init__(self, profile, urls, timeout=30, parent=None):
+        super().__init__(parent)
+        self.page = QWebEnginePage(profile, self)
+        self.page.loadFinished.connect(self.load_finished)
+        self.urls = urls
+        self.index = 0
+        self.loaded = 0
+        self.pending = False
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(int(timeout * 1000))
+        self.timer.timeout.connect(lambda: self.load_finished(False))
+    def start(self):
+        self.load_next()
+    def load_next(self):
+        if self.index >= len(self.urls):
+            self.finished_signal.emit(self.loaded)
+            return
+        url = self.urls[self.index]
+        self.index += 1
+        self.progress_signal.emit(f"Warming cache {self.index}/{len(self.urls)}: {url}")
+        self.pending = True
+        self.timer.start()
+        self.page.setUrl(QUrl(url))
+    def load_finished(self, ok):
+        if not self.pending:
+            return
+        self.pending = False
+        self.timer.stop()
+        self.loaded += bool(ok)
+        self.load_next()
+    def cancel(self):
+        self.pending = False
+        self.index = len(self.urls)
+        self.timer.stop()
+        self.page.triggerAction(QWebEnginePage.Stop)
+
 class CustomWebPage(QWebEnginePage):
-    def __init__(self, recorder):
-        super().__init__()
+    def __init__(self, recorder, profile=None):
+        super().__init__(profile or QWebEngineProfile.defaultProfile())
         self.recorder = recorder
+        install_replay_agent(self)
+        self.capture_bridge = install_capture_agent(self, recorder, recorder.config.get('recording', {}))
+        self.draining = False
+    def drain_capture(self, callback):
+        def drained(payload):
+            if isinstance(payload, str):
+                self.capture_bridge.capture(payload)
+            self.draining = False
+            callback()
+        self.draining = True
+        self.runJavaScript("window.__toolskitchCapture ? window.__toolskitchCapture.drain() : null", QWebEngineScript.ApplicationWorld, drained)
     def javaScriptConsoleMessage(self, level, message, lineNumber, sourceID):
         if self.recorder.is_recording:
             self.recorder.add_event('console_message', {'level': level, 'message': message, 'line': lineNumber, 'source': sourceID})
@@ -78,13 +2021,342 @@ class CustomWebPage(QWebEnginePage):
             self.recorder.add_event('navigation_request', {'url': url.toString(), 'type': _type})
         return super().acceptNavigationRequest(url, _type, isMainFrame)
 
+class StartupTimer:
+    def __init__(self, origin=None):
+        self.origin = PROCESS_STARTED if origin is None else origin
+        self.marks = {}
+    def mark(self, name):
+        self.marks.setdefault(name, (time.perf_counter() - self.origin) * 1000)
+    def write(self, filename):
+        with open(filename, 'w') as f:
+            json.dump({'unit': 'ms', 'marks': self.marks}, f, indent=2)
+
+def load_logo_pixmap(path, width, height, cache_directory):
+    stat = os.stat(path)
+    cache_path = os.path.join(cache_directory, f"logo_{width}x{height}_{int(stat.st_mtime)}_{stat.st_size}.png")
+    pixmap = QPixmap(cache_path) if os.path.exists(cache_path) else QPixmap()
+    if pixmap.isNull():
+        pixmap = QPixmap(path).scaled(width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        try:
+            os.makedirs(cache_directory, exist_ok=True)
+            pixmap.save(cache_path, "PNG")
+        except OSError:
+            pass
+    return pixmap
+
+class LogModel(QAbstractListModel):
+    CategoryRole = Qt.UserRole + 1
+    def __init__(self, max_lines=5000, flush_interval=100, parent=None):
+        super().__init__(parent)
+        self.max_lines = max_lines
+        self.lines = []
+        self.pending = []
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setInterval(flush_interval)
+        self.flush_timer.timeout.connect(self.flush)
+        self.flush_timer.start()
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.lines)
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.lines):
+            return None
+        text, category = self.lines[index.row()]
+        if role == Qt.DisplayRole:
+            return text
+        if role == LogModel.CategoryRole:
+            return category
+        return None
+    def append(self, text, category):
+        self.pending.append((text, category))
+        if len(self.pending) > 2 * self.max_lines:
+            del self.pending[:-self.max_lines]
+    def flush(self):
+        if not self.pending:
+            return
+        incoming = self.pending[-self.max_lines:]
+        self.pending = []
+        excess = len(self.lines) + len(incoming) - self.max_lines
+        if excess > 0:
+            self.beginRemoveRows(QModelIndex(), 0, excess - 1)
+            del self.lines[:excess]
+            self.endRemoveRows()
+        self.beginInsertRows(QModelIndex(), len(self.lines), len(self.lines) + len(incoming) - 1)
+        self.lines.extend(incoming)
+        self.endInsertRows()
+
+class LogPanel(QWidget):
+    def __init__(self, max_lines=5000, flush_interval=100, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.filter_combo = QComboBox()
+        for label, category in LOG_CATEGORIES:
+            self.filter_combo.addItem(label, category)
+        self.filter_combo.currentIndexChanged.connect(self.change_filter)
+        layout.addWidget(self.filter_combo)
+        self.model = LogModel(max_lines, flush_interval, self)
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        self.proxy.setFilterRole(LogModel.CategoryRole)
+        self.view = QListView()
+        self.view.setModel(self.proxy)
+        self.view.setUniformItemSizes(True)
+        self.view.setEditTriggers(QListView.NoEditTriggers)
+        self.view.setSelectionMode(QListView.ExtendedSelection)
+        layout.addWidget(self.view)
+        self.follow = True
+        self.view.verticalScrollBar().valueChanged.connect(self.track_scroll)
+        self.proxy.rowsInserted.connect(self.scroll_to_end)
+    def change_filter(self):
+        self.proxy.setFilterFixedString(self.filter_combo.currentData())
+        self.view.scrollToBottom()
+    def track_scroll(self, value):
+        self.follow = value >= self.view.verticalScrollBar().maximum()
+    def scroll_to_end(self):
+        if self.follow:
+            self.view.scrollToBottom()
+    def append(self, message, category='app'):
+        self.model.append(f"[{datetime.now().strftime('%H:%M:%S')}] {message}", category)
+
+class LibraryPanel(QWidget):
+    scan_finished = pyqtSignal(int, int)
+    session_activated = pyqtSignal(str)
+    def __init__(self, library, live_files=None, parent=None):
+        super().__init__(parent)
+        self.library = library
+        self.live_files = live_files or (lambda: [])
+        self.scanning = False
+        self.rescan_requested = False
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.search_bar = QLineEdit()
+        self.search_bar.setPlaceholderText("Find sessions by URL (e.g. /checkout)")
+        self.search_bar.textChanged.connect(self.refresh)
+        layout.addWidget(self.search_bar)
+        self.results = QListWidget()
+        self.results.itemDoubleClicked.connect(lambda item: self.session_activated.emit(item.data(Qt.UserRole)))
+        layout.addWidget(self.results)
+        self.rescan_timer = QTimer(self)
+        self.rescan_timer.setSingleShot(True)
+        self.rescan_timer.setInterval(500)
+        self.rescan_timer.timeout.connect(self.rescan)
+        self.watcher = QFileSystemWatcher([library.directory], self)
+        self.watcher.directoryChanged.connect(lambda _: self.rescan_timer.start())
+        self.scan_finished.connect(self.scan_done)
+        self.rescan()
+    def rescan(self):
+        if self.scanning:
+            self.rescan_requested = True
+            return
+        self.scanning = True
+        threading.Thread(target=self.scan_worker, args=(self.live_files(),), name="SessionLibraryScan", daemon=True).start()
+    def scan_worker(self, skip):
+        try:
+            indexed, removed = self.library.scan(skip)
+        except (OSError, sqlite3.Error):
+            indexed, removed = 0, 0
+        self.scan_finished.emit(indexed, removed)
+    def scan_done(self, indexed, removed):
+        self.scanning = False
+        if self.rescan_requested:
+            self.rescan_requested = False
+            self.rescan()
+        self.refresh()
+    def refresh(self):
+        self.results.clear()
+        for session in self.library.search(self.search_bar.text().strip() or None):
+            duration = f"{session['duration']:.0f}s" if session['duration'] is not None else "?"
+            item = QListWidgetItem(f"{session['start_time'] or '?'}  {os.path.basename(session['path'])}  ({session['event_count']} events, {duration})")
+            item.setToolTip("\n".join(f"{event_type}: {count}" for event_type, count in sorted(session['event_counts'].items())))
+            item.setData(Qt.UserRole, session['path'])
+            self.results.addItem(item)
+
+class ComparisonDialog(QDialog):
+    def __init__(self, report, parent=None):
+        super().__init__(parent)
+        self.report = report
+        self.setObjectName("comparisonDialog")
+        self.setWindowTitle(f"Compare: {os.path.basename(report['baseline'] or 'baseline')} vs {os.path.basename(report['candidate'] or 'candidate')}")
+        self.resize(760, 520)
+        if parent:
+            self.setPalette(parent.palette())
+        layout = QVBoxLayout(self)
+        summary = report['summary']
+        summary_label = QLabel(f"{summary['matched']} matched, {summary['added']} added, {summary['removed']} removed, {summary['slower']} slower, {summary['faster']} faster (threshold {report['threshold_ms']} ms, total {summary['total_delta_ms']:+.0f} ms)")
+        summary_label.setWordWrap(True)
+        layout.addWidget(summary_label)
+        controls_layout = QHBoxLayout()
+        self.filter_combo = QComboBox()
+        for label, status in COMPARE_FILTERS:
+            self.filter_combo.addItem(label, status)
+        self.filter_combo.currentIndexChanged.connect(self.refresh)
+        controls_layout.addWidget(self.filter_combo)
+        export_btn = QPushButton("Export JSON")
+        export_btn.setProperty("variant", "primary")
+        export_btn.clicked.connect(self.export)
+        controls_layout.addWidget(export_btn)
+        layout.addLayout(controls_layout)
+        self.model = QStringListModel(self)
+        self.view = QListView()
+        self.view.setUniformItemSizes(True)
+        self.view.setModel(self.model)
+        layout.addWidget(self.view)
+        self.refresh()
+    def refresh(self):
+        status = self.filter_combo.currentData()
+        self.model.setStringList([describe_change(change) for change in self.report['changes'] if not status or change['status'] == status])
+    def export(self):
+        default_name = os.path.splitext(base_filename(self.report['candidate'] or 'comparison'))[0] + '.diff.json'
+        filename, _ = QFileDialog.getSaveFileName(self, "Export Comparison", default_name, "JSON Files (*.json)")
+        if filename:
+            with open(filename, 'w') as f:
+                json.dump(self.report, f, indent=2)
+
+class ReplaySlots:
+    def __init__(self, max_active=2):
+        self.max_active = max(1, max_active)
+        self.active = set()
+        self.waiting = deque()
+    def submit(self, tab, start):
+        if len(self.active) < self.max_active:
+            self.active.add(tab)
+            start()
+            return True
+        self.waiting.append((tab, start))
+        return False
+    def release(self, tab):
+        self.active.discard(tab)
+        self.waiting = deque((waiting, start) for waiting, start in self.waiting if waiting is not tab)
+        while self.waiting and len(self.active) < self.max_active:
+            waiting, start = self.waiting.popleft()
+            self.active.add(waiting)
+            start()
+    def is_waiting(self, tab):
+        return any(waiting is tab for waiting, _ in self.waiting)
+
+class TabRequestGate(QWebEngineUrlRequestInterceptor):
+    def __init__(self, tab):
+        super().__init__(tab)
+        self.tab = tab
+    def interceptRequest(self, info):
+        if self.tab.network_blocked:
+            info.block(True)
+
+class BrowserTab(QWidget):
+    log_signal = pyqtSignal(str, str)
+    url_signal = pyqtSignal(str)
+    loaded_signal = pyqtSignal(bool)
+    def __init__(self, name, config, eager=False, parent=None):
+        super().__init__(parent)
+        self.name = name
+        self.config = config
+        self.recorder = SessionRecorder(config, name)
+        self.replayer = None
+        self.cache_warmer = None
+        self.session_filename = None
+        self.web_view = None
+        self.web_page = None
+        self.replay_driver = None
+        self.network_blocked = False
+        self.request_gate = TabRequestGate(self)
+        self.browser_layout = QVBoxLayout(self)
+        self.browser_layout.setContentsMargins(0, 0, 0, 0)
+        self.browser_placeholder = QLabel("Starting browser...")
+        self.browser_placeholder.setObjectName("browserPlaceholder")
+        self.browser_placeholder.setAlignment(Qt.AlignCenter)
+        self.browser_layout.addWidget(self.browser_placeholder)
+        self.keyframe_timer = QTimer(self)
+        self.keyframe_timer.timeout.connect(self.capture_keyframe)
+        if eager:
+            self.ensure_web_engine()
+    def ensure_web_engine(self):
+        if self.web_view is not None:
+            return
+        self.web_view = QWebEngineView()
+        self.web_page = CustomWebPage(self.recorder, browser_profile(self.config.get('profile', {})))
+        self.web_page.setUrlRequestInterceptor(self.request_gate)
+        self.web_view.setPage(self.web_page)
+        self.replay_driver = BrowserDriver(self.web_page, self.config.get('replay', {}))
+        self.replay_driver.error_signal.connect(lambda message: self.log_signal.emit(message, 'error'))
+        self.web_view.urlChanged.connect(self.url_changed)
+        self.web_view.loadFinished.connect(self.page_loaded)
+        self.browser_layout.removeWidget(self.browser_placeholder)
+        self.browser_placeholder.deleteLater()
+        self.browser_layout.addWidget(self.web_view)
+    def url_changed(self, url):
+        if self.recorder.is_recording:
+            self.recorder.add_event('navigation', {'url': url.toString()})
+            self.log_signal.emit(f"Navigation: {url.toString()}", 'navigation')
+        self.url_signal.emit(url.toString())
+    def page_loaded(self, success):
+        if success and self.recorder.is_recording:
+            self.recorder.add_event('page_loaded', {'url': self.web_view.url().toString()})
+            self.log_signal.emit("Page loaded", 'navigation')
+        self.loaded_signal.emit(success)
+    def start_keyframes(self):
+        interval = self.config.get('recording', {}).get('keyframe_interval_s', 15)
+        if interval > 0:
+            self.keyframe_timer.start(int(interval * 1000))
+    def capture_keyframe(self):
+        if self.web_page is None or not self.recorder.is_recording:
+            self.keyframe_timer.stop()
+            return
+        max_bytes = int(self.config.get('recording', {}).get('keyframe_max_dom_kb', 512) * 1024) if self.config.get('replay', {}).get('restore_dom', False) else 0
+        self.web_page.runJavaScript(KEYFRAME_JS % max_bytes, QWebEngineScript.ApplicationWorld, self.keyframe_captured)
+    def keyframe_captured(self, keyframe):
+        if isinstance(keyframe, dict) and self.recorder.is_recording:
+            self.recorder.add_event('keyframe', keyframe)
+    def is_replaying(self):
+        return self.cache_warmer is not None or bool(self.replayer and self.replayer.isRunning())
+    def shutdown(self):
+        if self.cache_warmer is not None:
+            self.cache_warmer.cancel()
+        if self.recorder.is_recording:
+            self.recorder.stop_recording()
+        if self.replayer and self.replayer.isRunning():
+            self.replayer.cancel()
+            self.replayer.wait()
+
 class ToolskitchMainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, startup_timer=None, startup_report_path=None):
         super().__init__()
-        self.recorder = SessionRecorder()
-        self.replayer = None
+        self.startup_timer = startup_timer or StartupTimer()
+        self.startup_report_path = startup_report_path
+        self.startup_reported = False
+        self.config = load_config()
+        self.replay_slots = ReplaySlots(self.config.get('replay', {}).get('max_concurrent_tabs', 2))
+        self.tab_counter = 0
+        self.network_proxy = None
+        self.proxy_owner = None
+        self.stats_version = None
         self.init_ui()
+        self.stats_timer = QTimer(self)
+        self.stats_timer.setInterval(self.config.get('ui', {}).get('stats_interval_ms', 500))
+        self.stats_timer.timeout.connect(self.render_live_stats)
         self.apply_dark_theme()
+        self.startup_timer.mark('window_created')
+    def current_tab(self):
+        return self.tabs.currentWidget()
+    def all_tabs(self):
+        return [self.tabs.widget(index) for index in range(self.tabs.count())]
+    @property
+    def recorder(self):
+        return self.current_tab().recorder
+    @property
+    def replayer(self):
+        return self.current_tab().replayer
+    @property
+    def web_view(self):
+        return self.current_tab().web_view
+    @property
+    def web_page(self):
+        return self.current_tab().web_page
+    @property
+    def replay_driver(self):
+        return self.current_tab().replay_driver
+    @property
+    def session_filename(self):
+        return self.current_tab().session_filename
     def apply_dark_theme(self):
         dark_palette = QPalette()
         dark_palette.setColor(QPalette.Window, QColor(53, 53, 53))
@@ -107,24 +2379,22 @@ class ToolskitchMainWindow(QMainWindow):
         logo_layout.setContentsMargins(10, 10, 10, 10)
         
         logo_label = QLabel()
+        logo_label.setObjectName("logo")
         logo_path = os.path.join(os.path.dirname(__file__), "logo.png")
         if os.path.exists(logo_path):
-            pixmap = QPixmap(logo_path)
-            scaled_pixmap = pixmap.scaled(120, 60, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            logo_label.setPixmap(scaled_pixmap)
+            logo_label.setPixmap(load_logo_pixmap(logo_path, 120, 60, resolve_path(self.config.get('ui', {}).get('cache_directory', '.cache'))))
         else:
             logo_label.setText("Toolskitch")
             logo_label.setFont(QFont("Arial", 16, QFont.Bold))
-            logo_label.setStyleSheet("color: #2a82da;")
         
         logo_label.setAlignment(Qt.AlignCenter)
-        logo_label.setStyleSheet("background-color: transparent; border: none;")
         logo_layout.addWidget(logo_label)
         
         return logo_widget
     def init_ui(self):
         self.setWindowTitle("Toolskitch - By Ansh")
         self.setGeometry(100, 100, 1200, 800)
+        self.setStyleSheet(APP_STYLESHEET)
         
         icon_path = os.path.join(os.path.dirname(__file__), "logo.ico")
         if not os.path.exists(icon_path):
@@ -154,221 +2424,192 @@ class ToolskitchMainWindow(QMainWindow):
         splitter.addWidget(control_panel)
         splitter.setSizes([800, 400])
         self.statusBar().showMessage("Ready")
+    def create_section_label(self, text):
+        label = QLabel(text)
+        label.setProperty("role", "section")
+        label.setFont(QFont("Arial", 12, QFont.Bold))
+        return label
+    def set_button_variant(self, button, variant):
+        button.setProperty("variant", variant)
+        button.style().unpolish(button)
+        button.style().polish(button)
     def create_toolbar(self):
         toolbar_widget = QWidget()
+        toolbar_widget.setObjectName("toolbar")
         toolbar_layout = QHBoxLayout(toolbar_widget)
         self.url_bar = QLineEdit()
         self.url_bar.setPlaceholderText("Enter URL (e.g., https://example.com)")
         self.url_bar.returnPressed.connect(self.navigate_to_url)
-        self.url_bar.setStyleSheet("""
-            QLineEdit {
-                background-color: #2a2a2a;
-                border: 2px solid #404040;
-                border-radius: 5px;
-                padding: 8px;
-                color: white;
-                font-size: 14px;
-            }
-            QLineEdit:focus {
-                border: 2px solid #2a82da;
-            }
-        """)
         toolbar_layout.addWidget(self.url_bar)
         self.enter_btn = QPushButton("Enter")
+        self.enter_btn.setProperty("variant", "primary")
         self.enter_btn.clicked.connect(self.navigate_to_url)
-        self.enter_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #2a82da;
-                border: none;
-                border-radius: 5px;
-                padding: 8px 16px;
-                color: white;
-                font-weight: bold;
-                font-size: 14px;
-            }
-            QPushButton:hover {
-                background-color: #1e6bb8;
-            }
-            QPushButton:pressed {
-                background-color: #155a9e;
-            }
-        """)
         toolbar_layout.addWidget(self.enter_btn)
         self.reload_btn = QPushButton("Reload")
         self.reload_btn.clicked.connect(self.refresh_page)
-        self.reload_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #404040;
-                border: none;
-                border-radius: 5px;
-                padding: 8px 16px;
-                color: white;
-                font-weight: bold;
-                font-size: 14px;
-            }
-            QPushButton:hover {
-                background-color: #505050;
-            }
-            QPushButton:pressed {
-                background-color: #303030;
-            }
-        """)
         toolbar_layout.addWidget(self.reload_btn)
+        self.new_tab_btn = QPushButton("New Tab")
+        self.new_tab_btn.clicked.connect(lambda: self.add_tab(eager=True))
+        toolbar_layout.addWidget(self.new_tab_btn)
         return toolbar_widget
     def create_browser_area(self):
-        browser_widget = QWidget()
-        browser_layout = QVBoxLayout(browser_widget)
-        self.web_view = QWebEngineView()
-        self.web_page = CustomWebPage(self.recorder)
-        self.web_view.setPage(self.web_page)
-        self.web_view.urlChanged.connect(self.url_changed)
-        self.web_view.loadFinished.connect(self.page_loaded)
-        browser_layout.addWidget(self.web_view)
-        return browser_widget
+        self.tabs = QTabWidget()
+        self.tabs.setTabsClosable(True)
+        self.tabs.setTabBarAutoHide(True)
+        self.tabs.tabCloseRequested.connect(self.close_tab)
+        self.add_tab(eager=not self.config.get('ui', {}).get('fast_start', True))
+        self.tabs.currentChanged.connect(self.tab_changed)
+        return self.tabs
+    def add_tab(self, eager=False):
+        self.tab_counter += 1
+        tab = BrowserTab(f"tab{self.tab_counter}", self.config, eager)
+        tab.network_blocked = self.network_proxy is not None
+        tab.log_signal.connect(lambda message, category: self.log_message(f"[{tab.name}] {message}" if self.tabs.count() > 1 else message, category))
+        tab.url_signal.connect(lambda url: self.tab_url_changed(tab, url))
+        tab.loaded_signal.connect(lambda success: self.tab_page_loaded(tab, success))
+        self.tabs.setCurrentIndex(self.tabs.addTab(tab, f"Tab {self.tab_counter}"))
+        return tab
+    def close_tab(self, index):
+        if self.tabs.count() <= 1:
+            return
+        tab = self.tabs.widget(index)
+        self.replay_slots.release(tab)
+        tab.shutdown()
+        self.stop_proxy(tab)
+        self.tabs.removeTab(index)
+        tab.deleteLater()
+    def tab_changed(self, index):
+        tab = self.tabs.widget(index)
+        if tab is None:
+            return
+        self.stats_version = None
+        self.url_bar.setText(tab.web_view.url().toString() if tab.web_view else "")
+        self.sync_controls()
+    def ensure_web_engine(self):
+        self.current_tab().ensure_web_engine()
+        self.startup_timer.mark('web_engine_ready')
+    def finish_startup(self):
+        self.ensure_web_engine()
+        if self.startup_reported:
+            return
+        self.startup_reported = True
+        marks = self.startup_timer.marks
+        self.log_message(f"Startup: window shown {marks.get('window_shown', 0):.0f} ms, first paint {marks.get('first_paint', 0):.0f} ms, browser ready {marks.get('web_engine_ready', 0):.0f} ms")
+        if self.startup_report_path:
+            self.startup_timer.write(self.startup_report_path)
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.startup_timer.mark('window_shown')
+        QTimer.singleShot(500, self.finish_startup)
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if 'first_paint' not in self.startup_timer.marks:
+            self.startup_timer.mark('first_paint')
+            QTimer.singleShot(0, self.finish_startup)
     def create_control_panel(self):
         control_widget = QWidget()
         control_layout = QVBoxLayout(control_widget)
         preview_group = QWidget()
         preview_layout = QVBoxLayout(preview_group)
         preview_label = QLabel("Your Preview Here")
+        preview_label.setObjectName("previewTitle")
         preview_label.setFont(QFont("Arial", 14, QFont.Bold))
-        preview_label.setStyleSheet("color: #2a82da; margin-bottom: 10px;")
         preview_label.setAlignment(Qt.AlignCenter)
         preview_layout.addWidget(preview_label)
         self.preview_text = QTextEdit()
         self.preview_text.setPlaceholderText("Preview area - Your web application will appear here...")
-        self.preview_text.setStyleSheet("""
-            QTextEdit {
-                background-color: #1a1a1a;
-                border: 2px solid #404040;
-                border-radius: 5px;
-                padding: 10px;
-                color: #cccccc;
-                font-size: 12px;
-            }
-            QTextEdit:focus {
-                border: 2px solid #2a82da;
-            }
-        """)
         preview_layout.addWidget(self.preview_text)
         control_layout.addWidget(preview_group)
         recording_group = QWidget()
         recording_layout = QVBoxLayout(recording_group)
-        recording_label = QLabel("Session Recording")
-        recording_label.setFont(QFont("Arial", 12, QFont.Bold))
-        recording_label.setStyleSheet("color: white; margin-top: 10px;")
-        recording_layout.addWidget(recording_label)
+        recording_layout.addWidget(self.create_section_label("Session Recording"))
         recording_buttons_layout = QHBoxLayout()
         self.record_btn = QPushButton("Start Recording")
+        self.record_btn.setProperty("variant", "primary")
         self.record_btn.clicked.connect(self.toggle_recording)
-        self.record_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #2a82da;
-                border: none;
-                border-radius: 5px;
-                padding: 8px 16px;
-                color: white;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #1e6bb8;
-            }
-            QPushButton:pressed {
-                background-color: #155a9e;
-            }
-        """)
         recording_buttons_layout.addWidget(self.record_btn)
         self.save_btn = QPushButton("Save Session")
         self.save_btn.clicked.connect(self.save_session)
         self.save_btn.setEnabled(False)
-        self.save_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #404040;
-                border: none;
-                border-radius: 5px;
-                padding: 8px 16px;
-                color: white;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #505050;
-            }
-            QPushButton:disabled {
-                background-color: #2a2a2a;
-                color: #666666;
-            }
-        """)
         recording_buttons_layout.addWidget(self.save_btn)
         recording_layout.addLayout(recording_buttons_layout)
         control_layout.addWidget(recording_group)
         replay_group = QWidget()
         replay_layout = QVBoxLayout(replay_group)
-        replay_label = QLabel("Session Replay")
-        replay_label.setFont(QFont("Arial", 12, QFont.Bold))
-        replay_label.setStyleSheet("color: white; margin-top: 10px;")
-        replay_layout.addWidget(replay_label)
+        replay_layout.addWidget(self.create_section_label("Session Replay"))
         replay_buttons_layout = QHBoxLayout()
         self.load_btn = QPushButton("Load Session")
         self.load_btn.clicked.connect(self.load_session)
-        self.load_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #404040;
-                border: none;
-                border-radius: 5px;
-                padding: 8px 16px;
-                color: white;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #505050;
-            }
-        """)
         replay_buttons_layout.addWidget(self.load_btn)
         self.replay_btn = QPushButton("Start Replay")
         self.replay_btn.clicked.connect(self.start_replay)
         self.replay_btn.setEnabled(False)
-        self.replay_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #404040;
-                border: none;
-                border-radius: 5px;
-                padding: 8px 16px;
-                color: white;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #505050;
-            }
-            QPushButton:disabled {
-                background-color: #2a2a2a;
-                color: #666666;
-            }
-        """)
         replay_buttons_layout.addWidget(self.replay_btn)
+        self.speed_combo = QComboBox()
+        for label, speed in REPLAY_SPEEDS:
+            self.speed_combo.addItem(label, speed)
+        default_speed = self.config.get('replay', {}).get('speed', 1.0)
+        self.speed_combo.setCurrentIndex(max(0, self.speed_combo.findData(default_speed)))
+        self.speed_combo.currentIndexChanged.connect(self.change_replay_speed)
+        replay_buttons_layout.addWidget(self.speed_combo)
+        self.cache_combo = QComboBox()
+        for label, mode in REPLAY_CACHE_MODES:
+            self.cache_combo.addItem(label, mode)
+        self.cache_combo.setCurrentIndex(max(0, self.cache_combo.findData(self.config.get('replay', {}).get('cache_mode', 'keep'))))
+        replay_buttons_layout.addWidget(self.cache_combo)
         replay_layout.addLayout(replay_buttons_layout)
+        replay_control_layout = QHBoxLayout()
+        self.pause_btn = QPushButton("Pause")
+        self.pause_btn.clicked.connect(self.toggle_replay_pause)
+        self.pause_btn.setEnabled(False)
+        replay_control_layout.addWidget(self.pause_btn)
+        self.stop_btn = QPushButton("Stop")
+        self.stop_btn.clicked.connect(self.stop_replay)
+        self.stop_btn.setEnabled(False)
+        replay_control_layout.addWidget(self.stop_btn)
+        self.replay_all_btn = QPushButton("Replay All Tabs")
+        self.replay_all_btn.clicked.connect(self.replay_all_tabs)
+        replay_control_layout.addWidget(self.replay_all_btn)
+        self.compare_btn = QPushButton("Compare...")
+        self.compare_btn.clicked.connect(self.compare_with_session)
+        replay_control_layout.addWidget(self.compare_btn)
+        replay_layout.addLayout(replay_control_layout)
+        timeline_layout = QHBoxLayout()
+        self.timeline_slider = QSlider(Qt.Horizontal)
+        self.timeline_slider.setTracking(False)
+        self.timeline_slider.setEnabled(False)
+        self.timeline_slider.valueChanged.connect(self.seek_timeline)
+        self.timeline_slider.sliderMoved.connect(lambda value: self.timeline_label.setText(self.timeline_text(value)))
+        timeline_layout.addWidget(self.timeline_slider)
+        self.timeline_label = QLabel(self.timeline_text(None))
+        timeline_layout.addWidget(self.timeline_label)
+        replay_layout.addLayout(timeline_layout)
         control_layout.addWidget(replay_group)
+        library_group = QWidget()
+        library_layout = QVBoxLayout(library_group)
+        library_layout.addWidget(self.create_section_label("Session Library"))
+        self.library_panel = LibraryPanel(SessionLibrary(self.recorder.session_directory, resolve_path(self.config.get('sessions', {}).get('catalog', os.path.join('.cache', CATALOG_FILENAME)))), self.live_journals)
+        self.library_panel.setObjectName("libraryPanel")
+        self.library_panel.setMaximumHeight(180)
+        self.library_panel.session_activated.connect(self.load_session_file)
+        library_layout.addWidget(self.library_panel)
+        control_layout.addWidget(library_group)
         log_group = QWidget()
         log_layout = QVBoxLayout(log_group)
-        log_label = QLabel("Session Log")
-        log_label.setFont(QFont("Arial", 12, QFont.Bold))
-        log_label.setStyleSheet("color: white; margin-top: 10px;")
-        log_layout.addWidget(log_label)
-        self.log_text = QTextEdit()
-        self.log_text.setMaximumHeight(150)
-        self.log_text.setStyleSheet("""
-            QTextEdit {
-                background-color: #1a1a1a;
-                border: 2px solid #404040;
-                border-radius: 5px;
-                padding: 8px;
-                color: #cccccc;
-                font-size: 11px;
-            }
-        """)
-        log_layout.addWidget(self.log_text)
+        log_layout.addWidget(self.create_section_label("Session Log"))
+        ui_config = self.config.get('ui', {})
+        self.log_panel = LogPanel(ui_config.get('log_max_lines', 5000), ui_config.get('log_flush_interval_ms', 100))
+        self.log_panel.setObjectName("logPanel")
+        self.log_panel.setMaximumHeight(190)
+        log_layout.addWidget(self.log_panel)
         control_layout.addWidget(log_group)
         return control_widget
+    def network_lock_message(self):
+        return f"{self.tabs.tabText(self.tabs.indexOf(self.proxy_owner))} is using the network proxy, which applies to every tab; this tab is paused until it finishes"
     def navigate_to_url(self):
+        if self.current_tab().network_blocked:
+            self.statusBar().showMessage(self.network_lock_message())
+            return
         url = self.url_bar.text()
         if not url.startswith(('http://', 'https://')):
             url = 'https://' + url
@@ -376,110 +2617,438 @@ class ToolskitchMainWindow(QMainWindow):
         self.loading_progress.setRange(0, 0)
         self.statusBar().showMessage("Loading...")
         self.preview_text.setPlainText(f"Loading: {url}")
+        self.ensure_web_engine()
         self.web_view.setUrl(QUrl(url))
     def refresh_page(self):
+        if self.current_tab().network_blocked:
+            self.statusBar().showMessage(self.network_lock_message())
+            return
+        self.ensure_web_engine()
         self.loading_progress.setVisible(True)
         self.loading_progress.setRange(0, 0)
         self.statusBar().showMessage("Reloading...")
         current_url = self.web_view.url().toString()
         self.preview_text.setPlainText(f"Reloading: {current_url}")
         self.web_view.reload()
-    def url_changed(self, url):
-        self.url_bar.setText(url.toString())
-        if self.recorder.is_recording:
-            self.recorder.add_event('navigation', {'url': url.toString()})
-            self.log_message(f"Navigation: {url.toString()}")
-    def page_loaded(self, success):
+    def tab_url_changed(self, tab, url):
+        self.tabs.setTabToolTip(self.tabs.indexOf(tab), url)
+        if tab is self.current_tab():
+            self.url_bar.setText(url)
+    def tab_page_loaded(self, tab, success):
+        title = tab.web_view.title() if success else ""
+        if title:
+            self.tabs.setTabText(self.tabs.indexOf(tab), title[:24])
+        if tab is not self.current_tab():
+            return
         self.loading_progress.setVisible(False)
         if success:
             self.statusBar().showMessage("Page loaded successfully")
-            current_url = self.web_view.url().toString()
-            self.preview_text.setPlainText(f"Loaded successfully: {current_url}")
-            if self.recorder.is_recording:
-                self.recorder.add_event('page_loaded', {'url': current_url})
-                self.log_message("Page loaded")
+            self.preview_text.setPlainText(f"Loaded successfully: {tab.web_view.url().toString()}")
         else:
             self.statusBar().showMessage("Failed to load page")
             self.preview_text.setPlainText("Failed to load page. Please check the URL and try again.")
+    def sync_controls(self):
+        tab = self.current_tab()
+        recording = tab.recorder.is_recording
+        replaying = tab.is_replaying()
+        waiting = self.replay_slots.is_waiting(tab)
+        self.record_btn.setText("Stop Recording" if recording else "Start Recording")
+        self.record_btn.setEnabled(not (tab.web_page and tab.web_page.draining) and not tab.network_blocked)
+        self.set_button_variant(self.record_btn, "danger" if recording else "primary")
+        self.save_btn.setEnabled(not recording and tab.recorder.start_time is not None)
+        self.replay_btn.setEnabled(bool(tab.session_filename) and not replaying and not waiting and not recording and not tab.network_blocked)
+        self.replay_all_btn.setEnabled(self.network_proxy is None)
+        for widget in (self.url_bar, self.enter_btn, self.reload_btn):
+            widget.setEnabled(not tab.network_blocked)
+        if tab.network_blocked:
+            self.statusBar().showMessage(self.network_lock_message())
+        self.pause_btn.setEnabled(bool(tab.replayer and tab.replayer.isRunning()))
+        self.pause_btn.setText("Resume" if tab.replayer and tab.replayer.paused else "Pause")
+        self.stop_btn.setEnabled(replaying or waiting)
+        total = len(tab.recorder.events) if tab.session_filename else 0
+        self.timeline_slider.setEnabled(bool(tab.replayer and tab.replayer.isRunning()))
+        self.timeline_slider.blockSignals(True)
+        self.timeline_slider.setRange(0, max(0, total - 1))
+        self.timeline_slider.setValue(tab.replayer.current_index if tab.replayer else 0)
+        self.timeline_slider.blockSignals(False)
+        self.timeline_label.setText(self.timeline_text(self.timeline_slider.value() if total else None))
+    def timeline_text(self, index):
+        total = len(self.current_tab().recorder.events) if index is not None and self.tabs.count() else 0
+        return f"Event {index + 1} / {total}" if total else "Event - / -"
+    def tab_position(self, tab, index):
+        if tab is not self.current_tab() or self.timeline_slider.isSliderDown():
+            return
+        self.timeline_slider.blockSignals(True)
+        self.timeline_slider.setValue(index)
+        self.timeline_slider.blockSignals(False)
+        self.timeline_label.setText(self.timeline_text(index))
+    def seek_timeline(self, index):
+        if self.replayer and self.replayer.isRunning():
+            self.replayer.seek(index)
+            self.log_message(f"Seeking to event {index + 1}", 'replay')
     def toggle_recording(self):
-        if not self.recorder.is_recording:
-            self.recorder.start_recording()
-            self.record_btn.setText("Stop Recording")
-            self.record_btn.setStyleSheet("""
-                QPushButton {
-                    background-color: #ff4444;
-                    border: none;
-                    border-radius: 5px;
-                    padding: 8px 16px;
-                    color: white;
-                    font-weight: bold;
-                }
-                QPushButton:hover {
-                    background-color: #cc3333;
-                }
-            """)
-            self.save_btn.setEnabled(False)
-            self.log_message("Recording started")
+        tab = self.current_tab()
+        if tab.network_blocked:
+            return
+        if not tab.recorder.is_recording:
+            tab.ensure_web_engine()
+            tab.recorder.start_recording()
+            if tab.recorder.network_cache is not None:
+                self.start_proxy(tab, 'record')
+            tab.web_page.capture_bridge.update_recording()
+            tab.start_keyframes()
+            self.stats_version = None
+            self.stats_timer.start()
+            tab.log_signal.emit("Recording started", 'recording')
             self.statusBar().showMessage("Recording session...")
             self.preview_text.setPlainText("🔴 Recording session...\n\nAll interactions will be captured.\nClick 'Stop Recording' when finished.")
-        else:
-            self.recorder.stop_recording()
-            self.record_btn.setText("Start Recording")
-            self.record_btn.setStyleSheet("""
-                QPushButton {
-                    background-color: #2a82da;
-                    border: none;
-                    border-radius: 5px;
-                    padding: 8px 16px;
-                    color: white;
-                    font-weight: bold;
-                }
-                QPushButton:hover {
-                    background-color: #1e6bb8;
-                }
-                QPushButton:pressed {
-                    background-color: #155a9e;
-                }
-            """)
-            self.save_btn.setEnabled(True)
-            self.log_message("Recording stopped")
+        elif not tab.web_page.draining:
+            tab.keyframe_timer.stop()
+            tab.web_page.drain_capture(lambda: self.finish_recording(tab))
+        self.sync_controls()
+    def live_journals(self):
+        return [tab.recorder.journal.filename for tab in self.all_tabs() if tab.recorder.is_recording and tab.recorder.journal]
+    def finish_recording(self, tab):
+        tab.recorder.stop_recording()
+        self.library_panel.rescan_timer.start()
+        self.stop_proxy(tab)
+        tab.web_page.capture_bridge.update_recording()
+        if tab.recorder.policy.dropped:
+            tab.log_signal.emit(f"Capture policy dropped events: {tab.recorder.policy.dropped_summary()}", 'recording')
+        tab.log_signal.emit("Recording stopped", 'recording')
+        if tab is self.current_tab():
             self.statusBar().showMessage("Recording stopped")
             self.preview_text.setPlainText("✅ Recording stopped\n\nSession saved. You can now save the session file.")
+        self.sync_controls()
+    def render_live_stats(self):
+        tab = self.current_tab()
+        if not any(other.recorder.is_recording for other in self.all_tabs()):
+            self.stats_timer.stop()
+            return
+        stats = tab.recorder.stats
+        if not tab.recorder.is_recording or stats.version == self.stats_version:
+            return
+        self.stats_version = stats.version
+        rates = stats.rates()
+        lines = [f"🔴 Recording - {stats.total} events in {stats.last_timestamp:.0f}s ({sum(rates.values()):.1f}/s over the last {stats.window}s)"]
+        if tab.recorder.policy.dropped:
+            lines.append(f"Dropped by capture policy: {sum(tab.recorder.policy.dropped.values())}")
+        lines.append("\nEvents/s by type:")
+        lines.extend(f"  {event_type}: {rate:.1f}/s ({stats.by_type[event_type]} total)" for event_type, rate in sorted(rates.items(), key=lambda item: -item[1]))
+        if stats.console_messages:
+            lines.append("\nTop console messages:")
+            lines.extend(f"  {count}x  {message}" for message, count in stats.console_messages.most_common(5))
+        if stats.navigations:
+            lines.append("\nNavigations:")
+            lines.extend(f"  {count}x  {url}" for url, count in stats.navigations.most_common(5))
+        if stats.page_loads:
+            lines.append("\nPage loads (avg / max):")
+            lines.extend(f"  {url}: {total / count:.0f} ms / {longest:.0f} ms ({count})" for url, (count, total, longest) in sorted(stats.page_loads.items(), key=lambda item: -item[1][2])[:5])
+        self.preview_text.setPlainText("\n".join(lines))
     def save_session(self):
-        filename, _ = QFileDialog.getSaveFileName(self, "Save Session", "", "JSON Files (*.json)")
+        filename, _ = QFileDialog.getSaveFileName(self, "Save Session", self.recorder.session_directory, SESSION_FILE_FILTER)
         if filename:
+            filename = self.recorder.with_compression_suffix(filename)
             self.recorder.save_session(filename)
             self.log_message(f"Session saved to {filename}")
             QMessageBox.information(self, "Success", "Session saved successfully!")
     def load_session(self):
-        filename, _ = QFileDialog.getOpenFileName(self, "Load Session", "", "JSON Files (*.json)")
-        if filename:
-            try:
-                session_data = self.recorder.load_session(filename)
-                self.replay_btn.setEnabled(True)
-                self.log_message(f"Session loaded: {len(session_data['events'])} events")
-                QMessageBox.information(self, "Success", "Session loaded successfully!")
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to load session: {str(e)}")
+        filename, _ = QFileDialog.getOpenFileName(self, "Load Session", self.recorder.session_directory, SESSION_FILE_FILTER)
+        if filename and self.load_session_file(filename):
+            QMessageBox.information(self, "Success", "Session loaded successfully!")
+    def load_session_file(self, filename):
+        tab = self.current_tab()
+        if tab.is_replaying() or tab.recorder.is_recording:
+            QMessageBox.warning(self, "Warning", "Stop the current recording or replay in this tab first")
+            return False
+        try:
+            session_data = tab.recorder.load_session(filename)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to load session: {str(e)}")
+            return False
+        tab.session_filename = filename
+        tab.log_signal.emit(f"Session loaded: {len(session_data['events'])} events ({os.path.basename(filename)})", 'app')
+        self.sync_controls()
+        return True
     def start_replay(self):
         if not self.recorder.events:
             QMessageBox.warning(self, "Warning", "No session loaded for replay")
             return
-        self.replayer = SessionReplayer(self.recorder.events, self.web_view)
-        self.replayer.progress_signal.connect(self.log_message)
-        self.replayer.finished_signal.connect(self.replay_finished)
-        self.replayer.start()
-        self.replay_btn.setEnabled(False)
-        self.log_message("Replay started")
-    def replay_finished(self):
-        self.replay_btn.setEnabled(True)
-        self.log_message("Replay finished")
+        self.queue_replay(self.current_tab())
+    def replay_all_tabs(self):
+        tabs = [tab for tab in self.all_tabs() if tab.session_filename and tab.recorder.events and not tab.is_replaying() and not tab.recorder.is_recording and not self.replay_slots.is_waiting(tab)]
+        if not tabs:
+            QMessageBox.warning(self, "Warning", "No tab has a session loaded for replay")
+            return
+        for tab in tabs:
+            self.queue_replay(tab)
+    def queue_replay(self, tab):
+        if tab.network_blocked:
+            tab.log_signal.emit(f"Replay blocked: {self.network_lock_message()}", 'error')
+            return
+        tab.replay_speed = self.speed_combo.currentData()
+        tab.cache_mode = self.cache_combo.currentData()
+        if not self.replay_slots.submit(tab, lambda: self.run_replay(tab)):
+            tab.log_signal.emit(f"Waiting for a replay slot ({len(self.replay_slots.active)}/{self.replay_slots.max_active} tabs replaying)", 'replay')
+        self.sync_controls()
+    def run_replay(self, tab):
+        if tab.network_blocked:
+            tab.log_signal.emit(f"Queued replay cancelled: {self.network_lock_message()}", 'error')
+            self.replay_slots.release(tab)
+            self.sync_controls()
+            return
+        tab.ensure_web_engine()
+        if tab.cache_mode == 'cold':
+            tab.web_page.profile().clearHttpCache()
+            tab.log_signal.emit("Browser HTTP cache cleared", 'replay')
+        if tab.recorder.network_cache and self.config.get('network', {}).get('replay_from_cache', True):
+            self.start_proxy(tab, 'replay')
+        if tab.cache_mode == 'warm':
+            tab.cache_warmer = CacheWarmer(tab.web_page.profile(), session_urls(tab.recorder.events), self.config.get('replay', {}).get('load_timeout', 30), tab)
+            tab.cache_warmer.progress_signal.connect(lambda message: tab.log_signal.emit(message, 'replay'))
+            tab.cache_warmer.finished_signal.connect(lambda loaded: self.cache_warmed(tab, loaded))
+            tab.cache_warmer.start()
+            self.sync_controls()
+            return
+        self.begin_replay(tab)
+    def cache_warmed(self, tab, loaded):
+        if self.tabs.indexOf(tab) < 0 or tab.cache_warmer is None:
+            return
+        tab.log_signal.emit(f"Cache warmed: {loaded}/{len(tab.cache_warmer.urls)} pages loaded", 'replay')
+        tab.cache_warmer.deleteLater()
+        tab.cache_warmer = None
+        self.begin_replay(tab)
+    def begin_replay(self, tab):
+        replay_config = self.config.get('replay', {})
+        tab.replayer = SessionReplayer(tab.recorder.events, tab.replay_driver, tab.replay_speed, replay_config.get('default_delay', 0.5), replay_config.get('wait_for_load', True), replay_config.get('auto_pause_on_error', True), tab.session_filename)
+        tab.replayer.metrics.cache_mode = tab.cache_mode
+        tab.replayer.progress_signal.connect(lambda message: tab.log_signal.emit(message, 'replay'))
+        tab.replayer.error_signal.connect(lambda message: tab.log_signal.emit(message, 'error'))
+        tab.replayer.finished_signal.connect(lambda: self.replay_finished(tab))
+        tab.replayer.position_signal.connect(lambda index: self.tab_position(tab, index))
+        tab.replayer.start()
+        tab.log_signal.emit(f"Replay started ({tab.cache_mode} cache)", 'replay')
+        self.sync_controls()
+    def compare_with_session(self):
+        baseline = self.session_filename
+        if not baseline:
+            baseline, _ = QFileDialog.getOpenFileName(self, "Select Baseline Session", self.recorder.session_directory, SESSION_FILE_FILTER)
+            if not baseline:
+                return
+        candidate, _ = QFileDialog.getOpenFileName(self, f"Compare {os.path.basename(baseline)} With", self.recorder.session_directory, SESSION_FILE_FILTER)
+        if not candidate:
+            return
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            report = compare_session_files(baseline, candidate, self.config.get('compare', {}))
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to compare sessions: {str(e)}")
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+        summary = report['summary']
+        self.log_message(f"Compared {os.path.basename(baseline)} with {os.path.basename(candidate)}: {summary['added']} added, {summary['removed']} removed, {summary['slower']} slower, {summary['faster']} faster")
+        ComparisonDialog(report, self).exec_()
+    def start_proxy(self, tab, mode):
+        busy = [self.tabs.tabText(self.tabs.indexOf(other)) for other in self.all_tabs() if other is not tab and (other.recorder.is_recording or other.is_replaying())]
+        if self.network_proxy or busy:
+            tab.log_signal.emit(f"Network proxy not started: it applies to every tab and {', '.join(busy) or 'another tab'} is active; using the live network", 'error')
+            return
+        network_config = self.config.get('network', {})
+        offline = False
+        if mode == 'replay' and network_config.get('offline', True):
+            missing = uncached_origins(tab.recorder.network_cache, session_urls(tab.recorder.events))
+            offline = not missing
+            if missing:
+                tab.log_signal.emit(f"No cached responses for {', '.join(missing)}; replaying online and serving only cached requests from the cache", 'error')
+        try:
+            self.network_proxy = start_network_proxy(tab.recorder.network_cache, mode, network_config, offline)
+        except OSError as e:
+            tab.log_signal.emit(f"Failed to start network proxy: {e}", 'error')
+            return
+        self.proxy_owner = tab
+        self.lock_network(tab)
+        if mode == 'record':
+            tab.log_signal.emit(f"Capturing network responses to {tab.recorder.network_cache.directory}", 'recording')
+        else:
+            tab.log_signal.emit(f"Serving {len(tab.recorder.network_cache)} cached responses{' (offline)' if self.network_proxy.offline else ''}", 'replay')
+    def stop_proxy(self, tab=None):
+        if not self.network_proxy or (tab is not None and tab is not self.proxy_owner):
+            return
+        stop_network_proxy(self.network_proxy)
+        cache = self.network_proxy.cache
+        if self.network_proxy.mode == 'record':
+            self.log_message(f"Captured {len(cache)} network responses", 'recording')
+        else:
+            self.log_message(f"Network cache: {cache.hits} hits, {cache.misses} misses", 'replay')
+        self.network_proxy = None
+        self.proxy_owner = None
+        self.lock_network(None)
+    def lock_network(self, owner):
+        for tab in self.all_tabs():
+            tab.network_blocked = owner is not None and tab is not owner
+    def change_replay_speed(self):
+        if self.replayer and self.replayer.isRunning():
+            self.replayer.set_speed(self.speed_combo.currentData())
+            self.log_message(f"Replay speed: {self.speed_combo.currentText()}", 'replay')
+    def toggle_replay_pause(self):
+        if not self.replayer or not self.replayer.isRunning():
+            return
+        if self.replayer.paused:
+            self.replayer.resume()
+        else:
+            self.replayer.pause()
+        self.sync_controls()
+    def stop_replay(self):
+        tab = self.current_tab()
+        if self.replay_slots.is_waiting(tab):
+            self.replay_slots.release(tab)
+            tab.log_signal.emit("Queued replay cancelled", 'replay')
+            self.sync_controls()
+        elif tab.cache_warmer is not None:
+            tab.cache_warmer.cancel()
+            tab.cache_warmer.deleteLater()
+            tab.cache_warmer = None
+            self.stop_proxy(tab)
+            self.replay_slots.release(tab)
+            tab.log_signal.emit("Replay cancelled during cache warm-up", 'replay')
+            self.sync_controls()
+        elif tab.replayer and tab.replayer.isRunning():
+            tab.replayer.cancel()
+    def replay_finished(self, tab):
+        self.replay_slots.release(tab)
+        self.stop_proxy(tab)
+        tab.log_signal.emit("Replay finished", 'replay')
+        if self.config.get('replay', {}).get('write_metrics', True) and tab.session_filename:
+            metrics_filename = report_path(self.config, os.path.splitext(os.path.basename(base_filename(tab.session_filename)))[0] + '.metrics.json')
+            try:
+                tab.replayer.metrics.write(metrics_filename)
+                tab.log_signal.emit(f"Performance report written to {metrics_filename}", 'replay')
+            except OSError as e:
+                tab.log_signal.emit(f"Failed to write performance report: {e}", 'error')
+        self.sync_controls()
         self.statusBar().showMessage("Replay completed")
-    def log_message(self, message):
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        self.log_text.append(f"[{timestamp}] {message}")
+    def closeEvent(self, event):
+        self.replay_slots.waiting.clear()
+        for tab in self.all_tabs():
+            tab.shutdown()
+        self.stop_proxy()
+        super().closeEvent(event)
+    def log_message(self, message, category='app'):
+        self.log_panel.append(message, category)
+def collect_session_files(patterns):
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            candidates = [os.path.join(pattern, name) for name in sorted(os.listdir(pattern))]
+        else:
+            candidates = sorted(glob.glob(pattern))
+        files.extend(path for path in candidates if os.path.isfile(path) and path.lower().endswith(SESSION_EXTENSIONS) and not path.lower().endswith(REPORT_EXTENSIONS))
+    return list(dict.fromkeys(files))
+
+def replay_session_headless(task):
+    filename, config, speed = task
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    app = QApplication.instance() or QApplication([sys.argv[0]])
+    result = {'session': filename, 'status': 'passed', 'events': 0, 'errors': [], 'duration': 0.0, 'worker': os.getpid()}
+    started = time.monotonic()
+    page = None
+    proxy = None
+    try:
+        events = open_session(filename)['events']
+        result['events'] = len(events)
+        network_config = config.get('network', {})
+        cache_directory = session_cache_directory(filename)
+        if os.path.isdir(cache_directory) and network_config.get('replay_from_cache', True):
+            cache = NetworkCache(cache_directory)
+            missing = uncached_origins(cache, session_urls(events)) if network_config.get('offline', True) else []
+            proxy = start_network_proxy(cache, 'replay', network_config, network_config.get('offline', True) and not missing)
+            if missing:
+                result['uncached_origins'] = missing
+        replay_config = config.get('replay', {})
+        page = QWebEnginePage(QWebEngineProfile(app))
+        install_replay_agent(page)
+        driver = BrowserDriver(page, replay_config)
+        replayer = SessionReplayer(events, driver, speed, replay_config.get('default_delay', 0.5), replay_config.get('wait_for_load', True), False, filename)
+        driver.error_signal.connect(result['errors'].append)
+        replayer.error_signal.connect(result['errors'].append)
+        loop = QEventLoop()
+        replayer.finished_signal.connect(loop.quit)
+        replayer.start()
+        loop.exec_()
+        replayer.wait()
+        result['metrics'] = replayer.metrics.report()
+        if proxy:
+            result['network_cache'] = {'hits': proxy.cache.hits, 'misses': proxy.cache.misses}
+        if result['errors']:
+            result['status'] = 'failed'
+    except Exception as e:
+        result['status'] = 'error'
+        result['errors'].append(str(e))
+    finally:
+        if proxy:
+            stop_network_proxy(proxy)
+        if page is not None:
+            profile = page.profile()
+            page.deleteLater()
+            app.processEvents()
+            profile.deleteLater()
+            app.processEvents()
+    result['duration'] = time.monotonic() - started
+    return result
+
+def run_batch(patterns, workers=None, summary_path=None, speed=0.0, config=None):
+    config = load_config() if config is None else config
+    files = collect_session_files(patterns)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(files) or 1))
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    started = time.time()
+    results = []
+    with multiprocessing.get_context('spawn').Pool(workers) as pool:
+        for result in pool.imap_unordered(replay_session_headless, [(filename, config, speed) for filename in files]):
+            results.append(result)
+            print(f"[{len(results)}/{len(files)}] {result['status'].upper()} {result['session']} ({result['events']} events, {result['duration']:.2f}s)")
+    results.sort(key=lambda result: result['session'])
+    totals = {status: sum(1 for result in results if result['status'] == status) for status in ('passed', 'failed', 'error')}
+    summary = {'started': datetime.fromtimestamp(started).isoformat(), 'duration': time.time() - started, 'workers': workers, 'speed': speed, 'totals': totals, 'sessions': results}
+    summary_path = summary_path or report_path(config, 'batch.summary.json')
+    with open(summary_path, 'w') as f:
+        json.dump(summary, f, indent=2)
+    print(f"{totals['passed']} passed, {totals['failed']} failed, {totals['error']} errors - summary written to {summary_path}")
+    return 0 if len(results) == totals['passed'] else 1
+
+def run_compare(baseline, candidate, output_path=None, config=None):
+    config = load_config() if config is None else config
+    report = compare_session_files(baseline, candidate, config.get('compare', {}))
+    output_path = output_path or os.path.splitext(base_filename(candidate))[0] + '.diff.json'
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    for change in report['regressions']:
+        print(describe_change(change))
+    summary = report['summary']
+    print(f"{summary['matched']} matched, {summary['added']} added, {summary['removed']} removed, {summary['slower']} slower, {summary['faster']} faster - report written to {output_path}")
+    return 1 if summary['slower'] else 0
+
 def main():
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser(description="Toolskitch - Customer Perspective Simulator")
+    parser.add_argument('--convert', nargs=2, metavar=('SOURCE', 'DESTINATION'), help="convert a session between .json, .tsj and .tsb formats and exit")
+    parser.add_argument('--batch', nargs='+', metavar='PATH', help="replay session files, directories or globs headlessly and exit")
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CANDIDATE'), help="align two sessions, report added/removed steps and timing deltas, and exit")
+    parser.add_argument('--workers', type=int, default=None, help="number of worker processes for --batch (default: CPU count)")
+    parser.add_argument('--summary', default=None, help="where --batch or --compare writes its JSON report")
+    parser.add_argument('--speed', type=float, default=0.0, help="replay speed multiplier for --batch, 0 for as fast as possible")
+    parser.add_argument('--startup-timing', metavar='FILE', default=None, help="write startup timing marks (ms) to FILE once the browser is ready")
+    args, qt_args = parser.parse_known_args()
+    if args.convert:
+        convert_session(*args.convert)
+        return
+    if args.compare:
+        sys.exit(run_compare(*args.compare, args.summary))
+    if args.batch:
+        sys.exit(run_batch(args.batch, args.workers, args.summary, args.speed))
+    startup_timer = StartupTimer()
+    app = QApplication(sys.argv[:1] + qt_args)
+    startup_timer.mark('app_created')
     app.setApplicationName("Toolskitch")
     app.setApplicationVersion("1.0.0")
     
@@ -491,7 +3060,7 @@ def main():
         icon = QIcon(icon_path)
         app.setWindowIcon(icon)
     
-    window = ToolskitchMainWindow()
+    window = ToolskitchMainWindow(startup_timer, args.startup_timing)
     window.show()
     
     if os.path.exists(icon_path):
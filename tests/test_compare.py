@@ -0,0 +1,50 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+
+
+def journey(rng, pages):
+    events = []
+    timestamp = 0.0
+    for _ in range(pages):
+        url = f"https://shop.example/page{rng.randrange(10)}"
+        events.append({'timestamp': timestamp, 'type': 'navigation', 'data': {'url': url}})
+        events.append({'timestamp': timestamp + 0.4, 'type': 'page_loaded', 'data': {'url': url}})
+        for selector in ('#search', '#add', '#cart'):
+            timestamp += 1.0
+            events.append({'timestamp': timestamp, 'type': 'click', 'data': {'selector': selector}})
+    return events
+
+
+def edited(rng, events, edits):
+    events = list(events)
+    for _ in range(edits):
+        index = rng.randrange(len(events))
+        if rng.random() < 0.5:
+            del events[index]
+        else:
+            events.insert(index, dict(events[index]))
+    return events
+
+
+def test_near_identical_journeys_with_repeated_pages_align():
+    rng = random.Random(1)
+    baseline = journey(rng, 2000)
+    candidate = edited(rng, baseline, 20)
+    summary = main.compare_sessions(baseline, candidate)['summary']
+    assert summary['added'] <= 20
+    assert summary['removed'] <= 20
+    assert summary['matched'] >= summary['baseline_steps'] - 20
+
+
+def test_small_alphabet_session_aligns_without_unique_anchors():
+    rng = random.Random(2)
+    baseline = [{'timestamp': float(index), 'type': 'click', 'data': {'selector': rng.choice('abcd')}} for index in range(20000)]
+    candidate = [event for event in baseline if rng.random() > 0.01]
+    summary = main.compare_sessions(baseline, candidate)['summary']
+    assert summary['matched'] == len(candidate)
+    assert summary['added'] == 0
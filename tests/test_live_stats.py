@@ -0,0 +1,19 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+
+
+def test_deduped_console_run_matches_live_count():
+    recorder = main.SessionRecorder({'recording': {'streaming': False, 'dedupe_window': 5.0}})
+    recorder.start_recording()
+    for _ in range(5):
+        recorder.add_event('console_message', {'level': 1, 'message': 'retrying', 'source': 'app.js'})
+    recorder.add_event('console_message', {'level': 1, 'message': 'done', 'source': 'app.js'})
+    recorder.stop_recording()
+    recorded = sum(event['data'].get('repeat_count', 1) for event in recorder.events if event['data']['message'] == 'retrying')
+    assert recorded == 5
+    assert recorder.stats.console_messages['retrying'] == 5
+    assert recorder.stats.console_messages['done'] == 1